@@ -0,0 +1,223 @@
+# benchmark.py
+# 고정된 시드와 크기로 주요 경로의 실행 시간을 재는 벤치마크 모음.
+# 결과는 JSON으로 저장해서 커밋끼리 비교할 수 있습니다.
+#
+# 사용법:
+#   python benchmark.py --out before.json
+#   python benchmark.py --out after.json --compare before.json
+#   python benchmark.py --only line_of_sight,physics --repeat 10
+
+import os
+os.environ["GRIDSHIFT_HEADLESS"] = "1" # config를 import하기 전에 설정해야 함 (창 없이 실행)
+
+import argparse
+import contextlib
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pygame
+from config import TILE_SIZE, CHUNK_SIZE, WORLD_HEIGHT, SAVE_EXTENSION
+from world import World, generate_map_data, save_map, load_map
+from entities import ItemDrop
+from utils import has_line_of_sight, lines_of_sight
+from controls import hold_keys
+from headless import run_headless
+
+SEED = 1234
+RESULT_VERSION = 1
+
+# 벤치마크마다 (준비 함수, 기준 크기). 준비 함수는 시간을 재지 않고, 돌려준 함수의 실행 시간만 잽니다.
+
+def bench_generate_map_data(params):
+    return lambda: generate_map_data(params["width"], WORLD_HEIGHT, SEED, 0.05, 4, workers=1)
+
+def bench_prepare_chunks(params):
+    # 예전 create_world_grid(타일 객체 격자)를 대신하는 경로: 청크 지형 생성 + 잔디 표시
+    world = World(SEED)
+    return lambda: [world.prepare_chunk(chunk_x) for chunk_x in range(params["chunks"])]
+
+def bench_chunk_streaming(params):
+    # main_game과 같은 방식으로 플레이어 주변 청크 창을 옮기며 로드/언로드 (타일을 고친 청크는 압축해서 보관)
+    def run():
+        world = World(SEED)
+        radius = params["radius"]
+        for player_chunk_x in range(params["chunks"]):
+            required = set(range(player_chunk_x - radius, player_chunk_x + radius + 1))
+            for chunk_x in set(world.chunks) - required:
+                world.unload_chunk(chunk_x)
+            for chunk_x in sorted(required - set(world.chunks)):
+                world.load_chunk(chunk_x)
+            # 플레이어가 블록 하나를 부쉈다고 보고 청크를 바뀐 상태로 만듦
+            column = world.chunks[player_chunk_x].types[:, 0]
+            world.set(player_chunk_x * CHUNK_SIZE, int(np.argmax(column != 0)), 0)
+    return run
+
+def bench_headless_game(params):
+    # 화면 없이 main_game 전체 (청크 로딩, 물리, 적, 잔디)를 오른쪽으로 걸으며 진행
+    def run():
+        random.seed(SEED)
+        run_headless(World(SEED), hold_keys(params["frames"], [pygame.K_d], jump_every=40))
+    return run
+
+def _loaded_world(chunks):
+    world = World(SEED)
+    for chunk_x in range(-chunks // 2, chunks - chunks // 2):
+        world.load_chunk(chunk_x)
+    return world
+
+def _random_rays(world, count, max_length):
+    rng = random.Random(SEED)
+    x_min, x_max = min(world.chunks) * CHUNK_SIZE, (max(world.chunks) + 1) * CHUNK_SIZE - 1
+    rays = []
+    for _ in range(count):
+        start = (rng.randint(x_min, x_max), rng.randint(0, world.height - 1))
+        end = (min(x_max, max(x_min, start[0] + rng.randint(-max_length, max_length))),
+               min(world.height - 1, max(0, start[1] + rng.randint(-max_length, max_length))))
+        rays.append((start, end))
+    return rays
+
+def bench_line_of_sight(params):
+    world = _loaded_world(params["chunks"])
+    rays = _random_rays(world, params["rays"], params["max_length"])
+    return lambda: [has_line_of_sight(start, end, world) for start, end in rays]
+
+def bench_lines_of_sight_batch(params):
+    world = _loaded_world(params["chunks"])
+    rays = _random_rays(world, params["rays"], params["max_length"])
+    starts, ends = np.array([start for start, _ in rays]), np.array([end for _, end in rays])
+    return lambda: lines_of_sight(starts, ends, world)
+
+def bench_physics(params):
+    # 아이템 N개를 지표면 위에서 떨어뜨려 일정 틱 동안 Entity.update_physics (타일 충돌만)
+    world = _loaded_world(4)
+    random.seed(SEED)
+    x_min = min(world.chunks) * CHUNK_SIZE
+    items = []
+    for i in range(params["items"]):
+        x = x_min + i % (4 * CHUNK_SIZE)
+        items.append(ItemDrop(x * TILE_SIZE + TILE_SIZE // 2, (world.surface_y(x) - 2 - i // (4 * CHUNK_SIZE)) * TILE_SIZE, "dirt"))
+    start_rects = [(item.rect.copy(), item.vel.copy()) for item in items]
+    def run():
+        for item, (rect, vel) in zip(items, start_rects):
+            item.rect, item.vel, item.is_on_ground = rect.copy(), vel.copy(), False
+        for _ in range(params["ticks"]):
+            for item in items:
+                item.update_physics(world)
+                item.apply_friction()
+    return run
+
+def bench_save_load(params):
+    # 고친 청크가 있는 월드를 새 파일로 저장한 뒤 다시 열어서 모든 청크를 읽음
+    world = _loaded_world(params["chunks"])
+    for chunk_x in world.chunks:
+        world.set(chunk_x * CHUNK_SIZE, world.surface_y(chunk_x * CHUNK_SIZE), 0)
+    # 게임의 저장 폴더 대신 임시 폴더에 씀 (불러오기 메뉴에 보이거나 실패했을 때 .tmp 파일이 남지 않도록)
+    save_folder = tempfile.TemporaryDirectory(prefix="gridshift-benchmark-")
+    world_name = "benchmark"
+    filename = os.path.join(save_folder.name, f"{world_name}{SAVE_EXTENSION}")
+    player_rect = pygame.Rect(0, 0, TILE_SIZE, TILE_SIZE)
+    def run():
+        world.region_file = None # 매번 처음 저장하는 경로 (전체 쓰기)
+        world.dirty = set(world.chunks)
+        try:
+            save_map(world, world_name, player_rect, folder=save_folder.name)
+            region = load_map(filename)["region"]
+            for chunk_x in region.chunk_xs():
+                region.read_chunk(chunk_x)
+        finally:
+            if os.path.exists(filename): os.remove(filename)
+    return run
+
+BENCHMARKS = {
+    "generate_map_data": (bench_generate_map_data, {"width": 1024}),
+    "prepare_chunks": (bench_prepare_chunks, {"chunks": 32}),
+    "chunk_streaming": (bench_chunk_streaming, {"chunks": 64, "radius": 2}),
+    "headless_game": (bench_headless_game, {"frames": 600}),
+    "line_of_sight": (bench_line_of_sight, {"chunks": 5, "rays": 5000, "max_length": 16}),
+    "lines_of_sight_batch": (bench_lines_of_sight_batch, {"chunks": 5, "rays": 5000, "max_length": 16}),
+    "physics": (bench_physics, {"items": 500, "ticks": 60}),
+    "save_load": (bench_save_load, {"chunks": 32}),
+}
+
+def run_benchmark(name, repeat):
+    setup, params = BENCHMARKS[name]
+    times = []
+    with contextlib.redirect_stdout(sys.stderr): # 게임 코드의 디버그 출력이 JSON 결과에 섞이지 않도록
+        run = setup(params)
+        run() # 첫 실행은 캐시/임포트 준비용으로 버림
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            times.append((time.perf_counter() - started) * 1000)
+    return {
+        "params": params,
+        "repeat": repeat,
+        "min_ms": round(min(times), 3),
+        "median_ms": round(statistics.median(times), 3),
+        "mean_ms": round(statistics.fmean(times), 3),
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_comparison(results, baseline):
+    print(f"\n{'benchmark':<22}{'before':>12}{'after':>12}{'ratio':>8}", file=sys.stderr)
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name)
+        if before is None or before.get("params") != result["params"]:
+            print(f"{name:<22}{'-':>12}{result['median_ms']:>10.2f}ms{'-':>8}", file=sys.stderr)
+            continue
+        ratio = result["median_ms"] / before["median_ms"] if before["median_ms"] else float("inf")
+        print(f"{name:<22}{before['median_ms']:>10.2f}ms{result['median_ms']:>10.2f}ms{ratio:>7.2f}x", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="고정 시드 벤치마크를 실행하고 결과를 JSON으로 저장합니다.")
+    parser.add_argument("--out", help="결과 JSON 파일 (주지 않으면 표준 출력)")
+    parser.add_argument("--only", help="쉼표로 구분한 벤치마크 이름 (" + ", ".join(BENCHMARKS) + ")")
+    parser.add_argument("--repeat", type=int, default=5, help="벤치마크마다 반복 횟수")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 파일")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"알 수 없는 벤치마크: {', '.join(unknown)}")
+
+    results = {}
+    for name in names:
+        results[name] = run_benchmark(name, args.repeat)
+        print(f"{name:<22}{results[name]['median_ms']:>10.2f}ms (min {results[name]['min_ms']:.2f}ms)", file=sys.stderr)
+
+    report = {
+        "version": RESULT_VERSION,
+        "seed": SEED,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pygame": pygame.version.ver,
+        "machine": platform.machine(),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            print_comparison(results, json.load(f))
+
+if __name__ == '__main__':
+    main()
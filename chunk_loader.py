@@ -0,0 +1,44 @@
+# chunk_loader.py
+# 청크 준비(저장 파일 읽기/압축 해제, 지형 생성, 잔디 노출 계산)를 백그라운드 스레드에서 처리합니다.
+# 준비가 끝난 청크는 다음 프레임 시작 때 메인 스레드에서 한 번에 월드에 넣습니다.
+# workers=0이면 스레드 없이 요청한 프레임에 바로 로드합니다 (녹화/재생처럼 청크가 들어오는 프레임이 매번 같아야 할 때).
+
+from concurrent.futures import ThreadPoolExecutor
+
+class ChunkLoader:
+    def __init__(self, world, workers=1):
+        self.world = world
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chunk-loader") if workers else None
+        self.pending = {} # 준비 중인 청크 {chunk_x: Future}
+
+    def request(self, chunk_xs):
+        """아직 로드되지 않았고 준비 중도 아닌 청크들의 준비 작업을 시작합니다."""
+        for chunk_x in chunk_xs:
+            if chunk_x not in self.world.chunks and chunk_x not in self.pending:
+                if self.executor is None:
+                    self.world.add_chunk(self.world.prepare_chunk(chunk_x))
+                else:
+                    self.pending[chunk_x] = self.executor.submit(self.world.prepare_chunk, chunk_x)
+
+    def swap_in(self, required_chunks):
+        """준비가 끝난 청크 중 아직 필요한 것만 월드에 넣습니다. 프레임 시작 때 호출합니다."""
+        for chunk_x, future in list(self.pending.items()):
+            if not future.done():
+                continue
+            del self.pending[chunk_x]
+            if chunk_x in required_chunks and chunk_x not in self.world.chunks:
+                self.world.add_chunk(future.result())
+
+    def load_now(self, chunk_x):
+        """꼭 필요한 청크를 바로 로드합니다 (준비 중이었다면 끝날 때까지 기다림)."""
+        if chunk_x in self.world.chunks:
+            return
+        future = self.pending.pop(chunk_x, None)
+        self.world.add_chunk(future.result() if future else self.world.prepare_chunk(chunk_x))
+
+    def shutdown(self):
+        for future in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
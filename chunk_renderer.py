@@ -0,0 +1,81 @@
+# chunk_renderer.py
+# 로드된 청크를 미리 그려둔 Surface로 캐시해서, 매 프레임 타일마다 그리는 대신 큰 이미지 몇 장만 blit합니다.
+# 청크는 SECTION_ROWS줄 단위 구역으로 나눠 화면에 보이는 구역만 그려두고,
+# 타일이 바뀌면 (설치, 파괴, 잔디 변화) 그 칸만 다시 그립니다.
+
+from collections import OrderedDict
+import numpy as np
+import pygame
+from config import TILE_SIZE, CHUNK_SIZE, SCREEN_WIDTH, SCREEN_HEIGHT, SKY_COLOR
+from entities import draw_tile
+
+SECTION_ROWS = 16
+MAX_CACHED_SECTIONS = 12 # 구역 하나가 1280x640 픽셀이므로 캐시 크기를 제한
+
+class ChunkRenderer:
+    def __init__(self, world):
+        self.world = world
+        self.sections = OrderedDict() # {(chunk_x, section_y): (Chunk, Surface)}, 최근에 쓴 순서
+        world.add_tile_listener(self.on_tile_change)
+
+    def _bake(self, chunk, section_y):
+        """청크의 한 구역을 새 Surface에 그립니다."""
+        surface = pygame.Surface((CHUNK_SIZE * TILE_SIZE, SECTION_ROWS * TILE_SIZE))
+        surface.fill(SKY_COLOR)
+        start_row = section_y * SECTION_ROWS
+        types = chunk.types[start_row:start_row + SECTION_ROWS]
+        ys, xs = np.nonzero(types)
+        for y, x in zip(ys.tolist(), xs.tolist()):
+            draw_tile(surface, types[y, x], x * TILE_SIZE, y * TILE_SIZE)
+        return surface
+
+    def _draw_cell(self, surface, chunk, x, y):
+        local_x, local_y = x % CHUNK_SIZE, y % SECTION_ROWS
+        tile_rect = (local_x * TILE_SIZE, local_y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+        surface.fill(SKY_COLOR, tile_rect)
+        tile_type = chunk.types[y, local_x]
+        if tile_type != 0:
+            draw_tile(surface, tile_type, tile_rect[0], tile_rect[1])
+
+    def _section(self, chunk_x, section_y):
+        """캐시된 구역 Surface. 없거나 청크가 다시 로드되었으면 새로 그립니다."""
+        chunk = self.world.chunks.get(chunk_x)
+        if chunk is None:
+            return None
+        key = (chunk_x, section_y)
+        cached = self.sections.get(key)
+        if cached is not None and cached[0] is chunk:
+            self.sections.move_to_end(key)
+            return cached[1]
+
+        surface = self._bake(chunk, section_y)
+        self.sections[key] = (chunk, surface)
+        self.sections.move_to_end(key)
+        while len(self.sections) > MAX_CACHED_SECTIONS:
+            self.sections.popitem(last=False)
+        return surface
+
+    def on_tile_change(self, x, y):
+        """타일 하나가 바뀌면 그 타일이 있는 구역에서 해당 칸만 다시 그립니다."""
+        chunk_x, section_y = x // CHUNK_SIZE, y // SECTION_ROWS
+        cached = self.sections.get((chunk_x, section_y))
+        if cached is None:
+            return
+        chunk, surface = cached
+        self._draw_cell(surface, chunk, x, y)
+
+    def draw(self, screen, camera_x, camera_y):
+        """카메라에 보이는 구역들을 blit합니다."""
+        section_w, section_h = CHUNK_SIZE * TILE_SIZE, SECTION_ROWS * TILE_SIZE
+        section_count = -(-self.world.height // SECTION_ROWS)
+        first_section = max(0, int(camera_y // section_h))
+        last_section = min(section_count - 1, int((camera_y + SCREEN_HEIGHT) // section_h))
+        for chunk_x in range(int(camera_x // section_w), int((camera_x + SCREEN_WIDTH) // section_w) + 1):
+            for section_y in range(first_section, last_section + 1):
+                surface = self._section(chunk_x, section_y)
+                if surface is not None:
+                    screen.blit(surface, (chunk_x * section_w - camera_x, section_y * section_h - camera_y))
+
+    def close(self):
+        self.world.remove_tile_listener(self.on_tile_change)
+        self.sections.clear()
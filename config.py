@@ -5,9 +5,16 @@ import os
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# 화면 없이 실행 (GRIDSHIFT_HEADLESS=1): 창과 오디오 장치 대신 SDL의 dummy 드라이버를 쓰고, main_game은 그리기를 건너뜀
+HEADLESS = os.environ.get("GRIDSHIFT_HEADLESS") == "1"
+if HEADLESS:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
 # Pygame 초기화
 pygame.init()
-pygame.mixer.init()
+if not HEADLESS:
+    pygame.mixer.init()
 
 # 화면 설정
 SCREEN_WIDTH, SCREEN_HEIGHT, FPS = 800, 600, 60
@@ -21,6 +28,7 @@ ORANGE, YELLOW = (255, 165, 0), (255, 255, 0)
 
 # 파일 및 폴더 경로
 SAVE_FOLDER = os.path.join(BASE_DIR, "saved_worlds")
+SAVE_EXTENSION = ".gsw" # 청크 단위 바이너리 저장 파일 (옛 .json 저장 파일도 불러올 수 있음)
 FONT_FILE = os.path.join(BASE_DIR, "NanumGothic.ttf")
 
 # 월드 저장 폴더 생성
@@ -64,11 +72,36 @@ BREAK_COOLDOWN = 15
 MAX_BREAK_TIME = 60
 GRASS_SPREAD_COOLDOWN = 30
 GRASS_DECAY_TIME = 45
+GRASS_SPREAD_CHANCE = 0.2 # 전파 후보 칸이 뽑혔을 때 잔디가 될 확률 (칸마다 평균 GRASS_SPREAD_COOLDOWN 틱에 한 번 뽑힘)
+GRASS_MAX_UPDATES_PER_TICK = 64 # 한 틱에 전파/소멸을 처리하는 최대 칸 수
 
 # --- ▼▼▼ 아이템 자석 효과 상수 추가 ▼▼▼ ---
 ITEM_MAGNET_RADIUS = 40  # 플레이어로부터 80픽셀(블록 2칸) 반경
 ITEM_MAGNET_SPEED = 3   # 초당 5픽셀의 속도로 끌어당김
 
+# --- 멈춘 아이템/파편 잠재우기 ---
+SLEEP_DELAY_FRAMES = 30 # 이만큼 연속으로 멈춰 있으면 물리 업데이트에서 제외
+
+# --- ▼▼▼ 고정 시간 간격 시뮬레이션 상수 추가 ▼▼▼ ---
+SIMULATION_STEP_MS = 1000 / FPS # 중력, 마찰, 각종 타이머는 모두 이 간격(한 틱) 기준의 값
+MAX_RENDER_FPS = 144 # 화면은 이 속도까지 그림 (0이면 제한 없음)
+MAX_STEPS_PER_FRAME = 5 # 밀린 틱은 한 프레임에 이만큼까지만 따라잡음 (더 밀리면 그만큼은 느려짐)
+
+# --- ▼▼▼ 프레임 프로파일러 상수 추가 ▼▼▼ ---
+PROFILER_WINDOW = 120 # Shift 오버레이의 평균/p99와 그래프에 쓰는 최근 프레임 수
+PROFILE_CSV = os.environ.get("GRIDSHIFT_PROFILE_CSV") # 경로를 주면 프레임마다 단계별 시간을 CSV로 기록
+RECORD_PATH = os.environ.get("GRIDSHIFT_RECORD") # 경로를 주면 플레이 입력을 녹화 (python replay.py 경로 로 재생)
+
+# --- ▼▼▼ 입자 상수 추가 ▼▼▼ ---
+PARTICLE_GRAVITY = 0.6 # 파편과 부스러기에 적용되는 중력 (엔티티와 같음)
+PARTICLE_LIFESPAN = 20 # 블록 부스러기가 사라지기까지의 프레임 수
+PARTICLE_BURST_COUNT = 8 # 블록 하나가 부서질 때 튀는 부스러기 수
+
+# --- ▼▼▼ 적 스폰 상수 추가 ▼▼▼ ---
+MAX_ENEMIES_PER_CHUNK = 2 # 로드된 청크 하나에 둘 수 있는 적의 최대 수
+ENEMY_SPAWN_INTERVAL = FPS * 10 # 이 프레임마다 적이 부족한 청크에 한 마리씩 추가
+ENEMY_SPAWN_MIN_DISTANCE = 12 # 플레이어로부터 이 칸 수 안쪽에는 스폰하지 않음
+
 # --- ▼▼▼ 낙하 데미지 상수 추가 ▼▼▼ ---
 SAFE_FALL_DISTANCE = TILE_SIZE * 4  # 4칸 (160픽셀)까지는 안전
 FALL_DAMAGE_SCALAR = 0.25            # 안전 높이를 초과한 픽셀당 0.5의 데미지
@@ -77,4 +110,5 @@ FALL_DAMAGE_SCALAR = 0.25            # 안전 높이를 초과한 픽셀당 0.5
 ENEMY_DAMAGE = 10 # 적의 공격 한 방당 데미지
 
 # --- ▼▼▼ 청크 시스템 상수 추가 ▼▼▼ ---
-CHUNK_SIZE = 32  # 맵을 32x32 타일 크기의 청크로 나눔
\ No newline at end of file
+CHUNK_SIZE = 32  # 맵을 32x32 타일 크기의 청크로 나눔
+WORLD_HEIGHT = 80 # 월드 높이 (가로 방향으로는 무한)
\ No newline at end of file
@@ -0,0 +1,165 @@
+# controls.py
+# main_game이 한 프레임에 읽는 입력 (이벤트, 눌린 키, 마우스)을 한곳에서 가져오는 입력 소스.
+# 실제 게임은 PygameInput으로 키보드/마우스를 읽고, 화면 없이 돌릴 때는 ScriptedInput으로 미리 정한 입력을 넣습니다.
+# InputRecorder는 플레이를 파일로 녹화하고, ReplayInput은 그 파일을 똑같이 다시 재생합니다 (replay.py).
+
+import base64
+import gzip
+import json
+import os
+import random
+from collections import namedtuple
+import pygame
+
+# 한 프레임의 입력. keys와 mouse_buttons는 pygame.key.get_pressed(), pygame.mouse.get_pressed()처럼 인덱스로 읽음
+# frame_ms는 지난 프레임 이후 흐른 시간 (None이면 poll에 넘겨준 실제 시간을 씀)
+FrameInput = namedtuple("FrameInput", ["events", "keys", "mouse_pos", "mouse_buttons", "frame_ms"], defaults=[None])
+
+RECORDING_VERSION = 2
+RECORDED_KEYS = (pygame.K_a, pygame.K_d, pygame.K_LSHIFT, pygame.K_RSHIFT) # 게임이 keys[...]로 읽는 (누르고 있는) 키
+
+class KeyState:
+    """눌린 키 집합을 pygame.key.get_pressed() 결과처럼 keys[pygame.K_a] 로 읽을 수 있게 감쌉니다."""
+    def __init__(self, held=()):
+        self.held = frozenset(held)
+
+    def __getitem__(self, key):
+        return key in self.held
+
+class InputSource:
+    """
+    main_game이 프레임마다 poll(frame_ms)로 읽는 입력 소스의 기본 클래스.
+    scripted: 사람이 조작하지 않는 입력 (일시정지 메뉴를 열지 않고, QUIT이면 프로그램을 끝내지 않고 돌아감)
+    deterministic: 같은 입력이면 같은 게임이 되도록 rng_seed로 난수를 고정하고 청크를 기다려서 로드함 (녹화/재생)
+    """
+    scripted = False
+    deterministic = False
+    rng_seed = None
+
+    def poll(self, frame_ms):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class PygameInput(InputSource):
+    """실제 키보드와 마우스 입력."""
+    def poll(self, frame_ms):
+        events = pygame.event.get() # 이벤트를 먼저 처리해야 키/마우스 상태가 갱신됨
+        return FrameInput(events, pygame.key.get_pressed(), pygame.mouse.get_pos(), pygame.mouse.get_pressed(), frame_ms)
+
+class ScriptedInput(InputSource):
+    """
+    미리 정한 입력을 프레임마다 하나씩 돌려줍니다. frames는 FrameInput 목록이거나, 프레임 번호를 받아 FrameInput을 돌려주는 함수입니다.
+    frame_count 프레임이 지나면 QUIT 이벤트를 보내 게임을 끝냅니다.
+    """
+    scripted = True
+
+    def __init__(self, frames, frame_count=None):
+        self.frames = frames
+        self.frame_count = len(frames) if frame_count is None else frame_count
+        self.frame = 0
+
+    def poll(self, frame_ms):
+        if self.frame >= self.frame_count:
+            return FrameInput([pygame.event.Event(pygame.QUIT)], KeyState(), (0, 0), (False, False, False), frame_ms)
+        frame_input = self.frames(self.frame) if callable(self.frames) else self.frames[self.frame]
+        self.frame += 1
+        if frame_input.frame_ms is None:
+            frame_input = frame_input._replace(frame_ms=frame_ms)
+        return frame_input
+
+def hold_keys(frame_count, keys=(), jump_every=None, mouse_pos=(0, 0)):
+    """keys를 계속 누른 채로 (jump_every 프레임마다 점프하며) frame_count 프레임 동안 움직이는 입력."""
+    held = KeyState(keys)
+    jump = [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE, unicode=' ', mod=0)]
+    def frame_input(frame):
+        events = jump if jump_every and frame % jump_every == 0 else []
+        return FrameInput(events, held, mouse_pos, (False, False, False))
+    return ScriptedInput(frame_input, frame_count)
+
+# --- 녹화와 재생 ---
+# 녹화 파일은 gzip으로 압축한 JSON 하나: 월드 정보, 난수 시드, 프레임 목록.
+# 저장된 월드에서 시작했다면 녹화를 시작할 때의 저장 파일 내용도 통째로 넣습니다 (끝날 때 같은 파일에 다시 저장되기 때문).
+# 프레임은 [frame_ms, 누른 키 비트, 마우스 x, 마우스 y, 마우스 버튼 비트, 이벤트 목록]이고,
+# 이벤트는 게임이 읽는 두 종류만 ["k", key, mod, unicode] (KEYDOWN), ["m", button] (MOUSEBUTTONDOWN)으로 저장합니다.
+
+def encode_frame(frame_input):
+    held = sum(1 << i for i, key in enumerate(RECORDED_KEYS) if frame_input.keys[key])
+    buttons = sum(1 << i for i, pressed in enumerate(frame_input.mouse_buttons[:3]) if pressed)
+    events = []
+    for event in frame_input.events:
+        if event.type == pygame.KEYDOWN:
+            events.append(["k", event.key, event.mod, event.unicode])
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            events.append(["m", event.button])
+    return [frame_input.frame_ms, held, frame_input.mouse_pos[0], frame_input.mouse_pos[1], buttons, events]
+
+def decode_frame(frame):
+    frame_ms, held, mouse_x, mouse_y, buttons, events = frame
+    decoded = []
+    for event in events:
+        if event[0] == "k":
+            decoded.append(pygame.event.Event(pygame.KEYDOWN, key=event[1], mod=event[2], unicode=event[3]))
+        else:
+            decoded.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=event[1], pos=(mouse_x, mouse_y)))
+    keys = KeyState(key for i, key in enumerate(RECORDED_KEYS) if held >> i & 1)
+    return FrameInput(decoded, keys, (mouse_x, mouse_y), tuple(bool(buttons >> i & 1) for i in range(3)), frame_ms)
+
+def load_recording(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        recording = json.load(f)
+    if recording.get("version") != RECORDING_VERSION:
+        raise ValueError(f"지원하지 않는 녹화 파일 버전: {recording.get('version')}")
+    return recording
+
+class InputRecorder(InputSource):
+    """
+    source의 입력을 그대로 넘겨주면서 프레임마다 기록하고, close()에서 path에 씁니다.
+    session에는 재생할 때 같은 월드를 만들기 위한 정보 (world_seed, world_name, start_pos, save_path)를 넣습니다.
+    save_path가 있으면 지금 그 파일의 내용을 save_data로 같이 기록합니다.
+    """
+    deterministic = True
+
+    def __init__(self, source, path, session):
+        self.source, self.path = source, path
+        self.scripted = source.scripted
+        self.session = dict(session)
+        if self.session.get("save_path"):
+            with open(self.session["save_path"], 'rb') as f:
+                self.session["save_data"] = base64.b64encode(f.read()).decode('ascii')
+        self.rng_seed = random.randrange(2 ** 32)
+        self.frames = []
+
+    def poll(self, frame_ms):
+        frame_input = self.source.poll(frame_ms)
+        # QUIT이 있는 프레임은 시뮬레이션되지 않고 끝나므로 기록하지 않음 (재생은 마지막 프레임 뒤에 QUIT을 보냄)
+        if not any(event.type == pygame.QUIT for event in frame_input.events):
+            self.frames.append(encode_frame(frame_input))
+        return frame_input
+
+    def close(self):
+        self.source.close()
+        if self.path is None: # 이미 저장함
+            return
+        recording = dict(self.session, version=RECORDING_VERSION, rng_seed=self.rng_seed, frames=self.frames)
+        with gzip.open(self.path, 'wt', encoding='utf-8') as f:
+            json.dump(recording, f, separators=(',', ':'), ensure_ascii=False)
+        self.path = None
+
+def write_recorded_save(recording, folder):
+    """녹화에 들어 있는 시작 월드의 저장 파일을 원래 확장자 그대로 folder에 쓰고 경로를 돌려줍니다. 저장된 월드가 아니면 None."""
+    if not recording.get("save_path"):
+        return None
+    path = os.path.join(folder, os.path.basename(recording["save_path"]))
+    with open(path, 'wb') as f:
+        f.write(base64.b64decode(recording["save_data"]))
+    return path
+
+class ReplayInput(ScriptedInput):
+    """load_recording으로 읽은 녹화를 녹화 당시의 프레임 시간, 입력, 난수 시드 그대로 다시 넣습니다."""
+    deterministic = True
+
+    def __init__(self, recording):
+        super().__init__([decode_frame(frame) for frame in recording["frames"]])
+        self.rng_seed = recording["rng_seed"]
@@ -1,82 +1,26 @@
 import pygame
 import random
 import math
+from functools import lru_cache
+import numpy as np
 from config import *
-from utils import has_line_of_sight
-
-class Particle:
-    def __init__(self, x, y):
-        self.pos = pygame.Vector2(x, y)
-        self.size = random.randint(4, 7)
-        self.vel = pygame.Vector2(random.uniform(-2, 2), random.uniform(-3, -1))
-        self.lifespan = 20
-    def update(self):
-        self.pos += self.vel; self.lifespan -= 1
-    def draw(self, screen, camera_x, camera_y):
-        pygame.draw.rect(screen, DIRT_COLOR, (self.pos.x-camera_x, self.pos.y-camera_y, self.size, self.size))
-
-class Tile:
-    def __init__(self, x, y, tile_type):
-        self.rect = pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
-        self.type = tile_type
-        if self.type == 3: # 타입이 3(돌)이면
-            self.max_health = 200 # 체력을 200으로 설정 (흙보다 2배 단단함)
-        #elif self.type == ?:
-        #    self.max_health = 300
-        else:
-            self.max_health = 100 # 나머지는 100
-        
-        self.health = self.max_health
-        self.crack_lines = None
-        self.time_covered = 0
-
-    def draw(self, screen, camera_x, camera_y, world_grid, x, y):
-        screen_x, screen_y = self.rect.x - camera_x, self.rect.y - camera_y
-        # 타일 타입에 따라 기본 색상을 결정
-        if self.type == 1 or self.type == 2: # 흙 또는 잔디
-            block_color = DIRT_COLOR
-        elif self.type == 3: # 돌
-            block_color = STONE_COLOR
-        else: # 혹시 모를 기본값
-            block_color = DIRT_COLOR
-            
-        pygame.draw.rect(screen, block_color, (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
+from utils import lines_of_sight
+
+def draw_tile(screen, tile_type, screen_x, screen_y):
+    """타일 타입에 맞는 블록 하나를 화면 좌표 (screen_x, screen_y)에 그립니다."""
+    # 타일 타입에 따라 기본 색상을 결정
+    if tile_type == 1 or tile_type == 2: # 흙 또는 잔디
+        block_color = DIRT_COLOR
+    elif tile_type == 3: # 돌
+        block_color = STONE_COLOR
+    else: # 혹시 모를 기본값
+        block_color = DIRT_COLOR
         
-        # 잔디 블록이면 위에 잔디를 덧그림 (기존과 동일)
-        if self.type == 2:
-            pygame.draw.rect(screen, GRASS_COLOR, (screen_x, screen_y, TILE_SIZE, 10))
-        if self.health < self.max_health and self.crack_lines:
-            crack_progress = 1 - (self.health / self.max_health)
-            lines_to_draw = int(len(self.crack_lines) * crack_progress)
-            for i in range(lines_to_draw):
-                start_pos = self.crack_lines[i][0]; end_pos = self.crack_lines[i][1]
-                pygame.draw.line(screen, CRACK_COLOR, (start_pos.x + screen_x, start_pos.y + screen_y), (end_pos.x + screen_x, end_pos.y + screen_y), 2)
-            
-    def take_damage(self, amount):
-        if self.health == self.max_health: self._generate_crack()
-        self.health -= amount
-        return self.health <= 0
+    pygame.draw.rect(screen, block_color, (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
     
-    def _generate_crack(self):
-        self.crack_lines = []
-        edge = random.choice(['top', 'bottom', 'left', 'right'])
-        if edge == 'top': point = pygame.Vector2(random.randint(0, TILE_SIZE), 0)
-        elif edge == 'bottom': point = pygame.Vector2(random.randint(0, TILE_SIZE), TILE_SIZE)
-        elif edge == 'left': point = pygame.Vector2(0, random.randint(0, TILE_SIZE))
-        else: point = pygame.Vector2(TILE_SIZE, random.randint(0, TILE_SIZE))
-        center_point = pygame.Vector2(TILE_SIZE/2, TILE_SIZE/2)
-        direction_vector = center_point - point
-        angle = direction_vector.angle_to(pygame.Vector2(1, 0))
-        for _ in range(15):
-            start_point = point.copy()
-            angle += random.uniform(-45, 45)
-            length = random.uniform(5, 10)
-            point.x += length * math.cos(math.radians(angle))
-            point.y -= length * math.sin(math.radians(angle))
-            point.x = max(0, min(TILE_SIZE, point.x))
-            point.y = max(0, min(TILE_SIZE, point.y))
-            end_point = point.copy()
-            self.crack_lines.append((start_point, end_point))
+    # 잔디 블록이면 위에 잔디를 덧그림 (기존과 동일)
+    if tile_type == 2:
+        pygame.draw.rect(screen, GRASS_COLOR, (screen_x, screen_y, TILE_SIZE, 10))
 
 class Entity:
     def __init__(self, x, y, width, height):
@@ -87,11 +31,26 @@ class Entity:
         self.max_health = 100
         self.health = self.max_health
         self.fall_start_y = None # ✨ 낙하 시작 높이 기록 변수 추가
+        self.sleeping = False # 멈춰서 물리 업데이트를 쉬는 중인지
+        self.rest_frames = 0
 
     def take_damage(self, amount):
         self.health -= amount
         if self.health < 0: self.health = 0
 
+    def update_rest(self, is_still):
+        """멈춘 상태가 SLEEP_DELAY_FRAMES 프레임 동안 이어지면 잠재웁니다."""
+        if is_still and self.is_on_ground and self.vel.x == 0:
+            self.rest_frames += 1
+            if self.rest_frames >= SLEEP_DELAY_FRAMES:
+                self.sleeping = True
+        else:
+            self.rest_frames = 0
+
+    def wake(self):
+        self.sleeping = False
+        self.rest_frames = 0
+
     def apply_friction(self):
         """땅 위에 있을 때만 마찰력을 적용합니다."""
         if self.is_on_ground:
@@ -100,14 +59,45 @@ class Entity:
             if abs(self.vel.x) < 0.1:
                 self.vel.x = 0
 
-    def update_physics(self, colliders):
+    def _land(self):
+        """아래로 떨어지다 바닥에 닿았을 때의 처리 (착지 및 낙하 데미지)."""
+        self.is_on_ground = True
+        self.jump_count = 0
+        self.vel.y = 0
+
+        # ✨ 착지 시 낙하 데미지 계산 ✨
+        if self.fall_start_y is not None:
+            fall_distance = self.rect.bottom - self.fall_start_y
+            if fall_distance > SAFE_FALL_DISTANCE:
+                damage = (fall_distance - SAFE_FALL_DISTANCE) * FALL_DAMAGE_SCALAR
+                self.take_damage(damage)
+                print(f"낙하! 거리: {fall_distance:.0f}, 데미지: {damage:.1f}") # 디버깅용 출력
+            self.fall_start_y = None # 낙하 상태 초기화
+
+    def update_physics(self, world, colliders=()):
+        """
+        한 축씩 움직인 뒤, 이번에 지나간 타일 줄만 타일맵에서 직접 검사해 충돌을 처리합니다.
+        colliders에는 타일 외에 부딪혀야 하는 Rect (다른 아이템 등)를 넘길 수 있습니다.
+        """
         # 1. 가로 방향 움직임 및 충돌 처리
+        old_left, old_right = self.rect.left, self.rect.right
         self.rect.x += self.vel.x
+        top_row, bottom_row = self.rect.top // TILE_SIZE, (self.rect.bottom - 1) // TILE_SIZE + 1
+        if self.vel.x > 0: # 오른쪽으로 이동 중 충돌
+            for col in range((old_right - 1) // TILE_SIZE, (self.rect.right - 1) // TILE_SIZE + 1):
+                if world.any_solid(col, top_row, col + 1, bottom_row):
+                    self.rect.right = col * TILE_SIZE
+                    break
+        elif self.vel.x < 0: # 왼쪽으로 이동 중 충돌
+            for col in range(old_left // TILE_SIZE, self.rect.left // TILE_SIZE - 1, -1):
+                if world.any_solid(col, top_row, col + 1, bottom_row):
+                    self.rect.left = (col + 1) * TILE_SIZE
+                    break
         for collider in colliders:
             if self.rect.colliderect(collider):
-                if self.vel.x > 0: # 오른쪽으로 이동 중 충돌
+                if self.vel.x > 0:
                     self.rect.right = collider.left
-                elif self.vel.x < 0: # 왼쪽으로 이동 중 충돌
+                elif self.vel.x < 0:
                     self.rect.left = collider.right
         
         # 2. 낙하 감지
@@ -117,29 +107,29 @@ class Entity:
 
         # 3. 세로 방향 움직임 (중력 적용)
         self.vel.y += self.gravity
+        old_top, old_bottom = self.rect.top, self.rect.bottom
         self.rect.y += self.vel.y
         self.is_on_ground = False # 매번 초기화
 
         # 4. 세로 방향 충돌 처리
+        left_col, right_col = self.rect.left // TILE_SIZE, (self.rect.right - 1) // TILE_SIZE + 1
+        if self.vel.y > 0: # 아래로 떨어지다 충돌 (착지)
+            for row in range((old_bottom - 1) // TILE_SIZE, (self.rect.bottom - 1) // TILE_SIZE + 1):
+                if world.any_solid(left_col, row, right_col, row + 1):
+                    self.rect.bottom = row * TILE_SIZE
+                    self._land()
+                    break
+        elif self.vel.y < 0: # 위로 점프하다 충돌 (천장에 닿음)
+            for row in range(old_top // TILE_SIZE, self.rect.top // TILE_SIZE - 1, -1):
+                if world.any_solid(left_col, row, right_col, row + 1):
+                    self.rect.top = (row + 1) * TILE_SIZE
+                    self.vel.y = 0
+                    break
         for collider in colliders:
             if self.rect.colliderect(collider):
-                # 아래로 떨어지다 충돌 (착지)
                 if self.vel.y > 0:
                     self.rect.bottom = collider.top
-                    self.is_on_ground = True
-                    self.jump_count = 0
-                    self.vel.y = 0
-
-                    # ✨ 착지 시 낙하 데미지 계산 ✨
-                    if self.fall_start_y is not None:
-                        fall_distance = self.rect.bottom - self.fall_start_y
-                        if fall_distance > SAFE_FALL_DISTANCE:
-                            damage = (fall_distance - SAFE_FALL_DISTANCE) * FALL_DAMAGE_SCALAR
-                            self.take_damage(damage)
-                            print(f"낙하! 거리: {fall_distance:.0f}, 데미지: {damage:.1f}") # 디버깅용 출력
-                        self.fall_start_y = None # 낙하 상태 초기화
-
-                # 위로 점프하다 충돌 (천장에 닿음)
+                    self._land()
                 elif self.vel.y < 0:
                     self.rect.top = collider.bottom
                     self.vel.y = 0
@@ -148,20 +138,36 @@ class Entity:
         if self.is_on_ground:
             self.fall_start_y = None
 
-class Debris(Entity):
-    def __init__(self, x, y, width, height, color):
-        super().__init__(x, y, width, height)
-        self.color = color
-        self.vel = pygame.Vector2(random.uniform(-8, 8), random.uniform(-15, -5))
-        self.friction = 0.7 # ✨ 강한 마찰력 설정 (값이 낮을수록 강함)
-
-    def update(self, colliders):
-        self.update_physics(colliders)
-        self.apply_friction() # ✨ 마찰력 적용
-
-    def draw(self, screen, camera_x, camera_y):
-        pygame.draw.rect(screen, self.color, (self.rect.x - camera_x, self.rect.y - camera_y, self.rect.width, self.rect.height))
-
+ITEM_SPRITE_ANGLE_STEP = 5 # 회전한 아이템 이미지는 5도 단위로 만들어 둠
+ITEM_SPRITE_CACHE_SIZE = 512 # 아이템 종류 x 각도(72개) 조합을 넉넉히 담는 크기
+
+@lru_cache(maxsize=ITEM_SPRITE_CACHE_SIZE)
+def item_sprite(item_type, width, height, angle_step):
+    """angle_step * ITEM_SPRITE_ANGLE_STEP 도만큼 회전한 아이템 이미지. 조합마다 한 번만 만들고 재사용합니다."""
+    original_surf = pygame.Surface((width, height), pygame.SRCALPHA)
+    if item_type == "grass":
+        color = GRASS_COLOR
+    elif item_type == "stone":
+        color = STONE_COLOR
+    else: # 기본값은 흙
+        color = DIRT_COLOR
+    pygame.draw.rect(original_surf, color, original_surf.get_rect())
+    pygame.draw.rect(original_surf, BLACK, original_surf.get_rect(), 2)
+
+    rotated_surf = pygame.transform.rotate(original_surf, angle_step * ITEM_SPRITE_ANGLE_STEP)
+    if pygame.display.get_surface() is not None:
+        rotated_surf = rotated_surf.convert_alpha() # 화면과 같은 픽셀 형식이면 blit이 빠름
+    return rotated_surf
+
+def magnet_mask(centers, player):
+    """
+    아이템 중심 좌표 (N, 2) 가 플레이어의 머리, 몸통, 발 중 하나라도 자석 반경 안에 있는지 한 번에 계산합니다.
+    결과는 길이 N의 bool 배열입니다.
+    """
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 1, 2)
+    body_points = np.array([player.head_rect.center, player.torso_rect.center, (player.rect.centerx, player.rect.bottom - 5)], dtype=np.float64)
+    distances_sq = ((centers - body_points) ** 2).sum(axis=2) # (N, 3): 아이템마다 세 지점까지의 거리 제곱
+    return (distances_sq < ITEM_MAGNET_RADIUS ** 2).any(axis=1)
 
 class ItemDrop(Entity):
     def __init__(self, x, y, item_type):
@@ -173,28 +179,20 @@ class ItemDrop(Entity):
         self.angular_velocity = 0
         self.friction = 0.7 # ✨ 강한 마찰력 설정
 
-    def update(self, colliders, player):
-        # 1. 아이템과 플레이어의 각 신체 부위 위치를 가져옵니다.
-        item_pos = pygame.math.Vector2(self.rect.center)
-        head_pos = pygame.math.Vector2(player.head_rect.center)
-        torso_pos = pygame.math.Vector2(player.torso_rect.center)
-        feet_pos = pygame.math.Vector2(player.rect.centerx, player.rect.bottom - 5)
-
-        # 2. 아이템과 세 지점 사이의 거리를 각각 계산합니다.
-        distance_to_head = item_pos.distance_to(head_pos)
-        distance_to_torso = item_pos.distance_to(torso_pos)
-        distance_to_feet = item_pos.distance_to(feet_pos)
-
-        # 3. 세 거리 중 하나라도 자석 반경 안에 들어오는지 확인합니다.
-        is_in_magnet_range = (
-            distance_to_head < ITEM_MAGNET_RADIUS or
-            distance_to_torso < ITEM_MAGNET_RADIUS or
-            distance_to_feet < ITEM_MAGNET_RADIUS
-        )
-
-        # 4. 자석 반경 안에 있다면, '몸통'을 목표로 아이템을 끌어당깁니다.
+    def in_magnet_range(self, player):
+        return bool(magnet_mask([self.rect.center], player)[0])
+
+    def update(self, world, colliders, player, is_in_magnet_range=None):
+        """is_in_magnet_range를 주면 (magnet_mask로 여러 아이템을 한 번에 계산한 결과) 거리 계산을 다시 하지 않습니다."""
+        if self.sleeping:
+            return
+
+        # 1. 자석 반경 안에 있다면, '몸통'을 목표로 아이템을 끌어당깁니다.
+        if is_in_magnet_range is None:
+            is_in_magnet_range = self.in_magnet_range(player)
         if is_in_magnet_range:
-            pull_target = torso_pos # 목표 지점은 몸통 중심
+            item_pos = pygame.math.Vector2(self.rect.center)
+            pull_target = pygame.math.Vector2(player.torso_rect.center) # 목표 지점은 몸통 중심
             direction = pull_target - item_pos
             if direction.length() > 0:
                 direction.normalize_ip()
@@ -204,9 +202,9 @@ class ItemDrop(Entity):
             self.rect.y += self.vel.y
             self.angular_velocity = 0
 
-        # 5. 반경 밖에 있다면, 일반 물리 로직(중력, 충돌, 마찰)을 실행합니다.
+        # 2. 반경 밖에 있다면, 일반 물리 로직(중력, 충돌, 마찰)을 실행합니다.
         else:
-            self.update_physics(colliders) # 중력 및 충돌
+            self.update_physics(world, colliders) # 중력 및 충돌
             self.apply_friction()         # 마찰력 (미끄러짐 방지)
 
             # 회전 로직 (구르는 효과는 없음)
@@ -215,20 +213,28 @@ class ItemDrop(Entity):
             if abs(self.angular_velocity) < 0.05:
                 self.angular_velocity = 0
 
-    def check_stability(self, potential_supporters):
+        # 3. 멈춰 있으면 잠들 준비 (모서리에 걸쳐 제자리에서 돌기만 하는 아이템도 잠들면서 회전을 멈춤)
+        self.update_rest(not is_in_magnet_range)
+        if self.sleeping:
+            self.angular_velocity = 0
+
+    def check_stability(self, world, item_rects):
         # 1. 공중에 떠 있다면 안정성 검사를 할 필요가 없음
         if not self.is_on_ground:
             return
 
-        # 2. 아이템 바로 아래에 받침대가 있는지 찾아봄
+        # 2. 아이템 바로 아래에 받침대(블록 또는 다른 아이템)가 있는지 찾아봄
         my_feet_rect = self.rect.move(0, 1)
-        supporters = [s for s in potential_supporters if my_feet_rect.colliderect(s)]
+        supporters = [s for s in item_rects if my_feet_rect.colliderect(s)]
+        top_row, bottom_row = my_feet_rect.top // TILE_SIZE, (my_feet_rect.bottom - 1) // TILE_SIZE + 1
+        support_cols = [col for col in range(my_feet_rect.left // TILE_SIZE, (my_feet_rect.right - 1) // TILE_SIZE + 1)
+                        if world.any_solid(col, top_row, col + 1, bottom_row)]
 
         # 3. 받침대가 있는 경우에만 안정성 검사를 수행
-        if supporters:
+        if supporters or support_cols:
             # 받침대의 왼쪽 끝과 오른쪽 끝 좌표를 구함
-            support_min_x = min(s.left for s in supporters)
-            support_max_x = max(s.right for s in supporters)
+            support_min_x = min([s.left for s in supporters] + [col * TILE_SIZE for col in support_cols])
+            support_max_x = max([s.right for s in supporters] + [(col + 1) * TILE_SIZE for col in support_cols])
             
             # 아이템의 중심이 받침대 범위를 벗어났는지 확인
             is_unstable = self.rect.centerx < support_min_x or self.rect.centerx > support_max_x
@@ -246,24 +252,14 @@ class ItemDrop(Entity):
             self.is_on_ground = False # 아래로 떨어지기 시작
     
     def draw(self, screen, camera_x, camera_y):
-        # 1. 원본 이미지 서피스를 만듭니다. (매번 만들지 않고 __init__에서 만들어두는 게 더 효율적)
-        original_surf = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)
-        if self.item_type == "grass":
-            color = GRASS_COLOR
-        elif self.item_type == "stone":
-            color = STONE_COLOR
-        else: # 기본값은 흙
-            color = DIRT_COLOR
-        pygame.draw.rect(original_surf, color, original_surf.get_rect())
-        pygame.draw.rect(original_surf, BLACK, original_surf.get_rect(), 2)
-
-        # 2. 원본 이미지를 현재 각도(self.angle)만큼 회전시킵니다.
-        rotated_surf = pygame.transform.rotate(original_surf, self.angle)
-
-        # 3. 회전된 이미지의 새 사각 영역을 얻고, 중심점을 아이템의 실제 위치에 맞춥니다.
+        # 1. 현재 각도(self.angle)에 가장 가까운, 미리 회전해 둔 이미지를 가져옵니다.
+        angle_step = round(self.angle / ITEM_SPRITE_ANGLE_STEP) % (360 // ITEM_SPRITE_ANGLE_STEP)
+        rotated_surf = item_sprite(self.item_type, self.rect.width, self.rect.height, angle_step)
+
+        # 2. 회전된 이미지의 새 사각 영역을 얻고, 중심점을 아이템의 실제 위치에 맞춥니다.
         rotated_rect = rotated_surf.get_rect(center = self.rect.center)
 
-        # 4. 최종적으로 회전된 이미지를 화면에 그립니다. (카메라 위치 반영)
+        # 3. 최종적으로 회전된 이미지를 화면에 그립니다. (카메라 위치 반영)
         screen.blit(rotated_surf, (rotated_rect.x - camera_x, rotated_rect.y - camera_y))
 
 class Player(Entity):
@@ -328,6 +324,14 @@ class Player(Entity):
         if 0 <= slot_index < len(self.item_slots):
             self.selected_slot = slot_index
 
+    def body_grid_cells(self):
+        """시야 확인에 쓰는 머리, 몸, 발의 그리드 좌표."""
+        head_grid_pos = (self.head_rect.centerx // TILE_SIZE, self.head_rect.centery // TILE_SIZE)
+        torso_grid_pos = (self.torso_rect.centerx // TILE_SIZE, self.torso_rect.centery // TILE_SIZE)
+        feet_pos = (self.rect.centerx, self.rect.bottom - 5) # 발 위치 근사치
+        feet_grid_pos = (feet_pos[0] // TILE_SIZE, feet_pos[1] // TILE_SIZE)
+        return head_grid_pos, torso_grid_pos, feet_grid_pos
+
     def start_breaking(self):
         """블록 파괴 애니메이션을 시작합니다."""
         self.is_breaking = True
@@ -346,8 +350,9 @@ class Player(Entity):
         if self.invincible_timer <= 0:
             super().take_damage(amount); self.invincible_timer = 90
 
-    def handle_input(self):
-        keys = pygame.key.get_pressed()
+    def handle_input(self, keys=None):
+        if keys is None:
+            keys = pygame.key.get_pressed()
         acceleration, max_speed = 0.5, 3
         if keys[pygame.K_a]: self.vel.x -= acceleration; self.facing_direction = -1
         if keys[pygame.K_d]: self.vel.x += acceleration; self.facing_direction = 1
@@ -371,7 +376,8 @@ class Player(Entity):
             self.swing_angle += (0 - self.swing_angle) * 0.1
             if abs(self.swing_angle) < 0.5: self.swing_angle, self.walk_cycle_timer = 0, 0
 
-    def update(self, tile_rects):
+    def update(self, world, keys=None):
+        """keys: 이번 틱에 눌린 키 (주지 않으면 pygame에서 직접 읽음)."""
         if self.invincible_timer > 0: self.invincible_timer -= 1
         
         # 애니메이션 타이머 업데이트
@@ -381,8 +387,8 @@ class Player(Entity):
             self.breaking_animation_timer += 0.2 # 이 값으로 스윙 속도 조절
 
         # 나머지 업데이트 로직 (한 번만 호출)
-        self.handle_input()
-        self.update_physics(tile_rects)
+        self.handle_input(keys)
+        self.update_physics(world)
         self.update_animation()
         # --- ✨ 추가: 매 프레임 신체 부위 위치를 업데이트 ✨ ---
         # 이 로직을 draw()가 아닌 update()의 마지막에 두어 항상 최신 위치를 유지합니다.
@@ -474,6 +480,7 @@ class Enemy(Entity):
         self.torso_rect = pygame.Rect(0,0,int(35*self.scale_factor), self.torso_height)
         self.head_rect, self.left_leg_rect, self.right_leg_rect = pygame.Rect(0,0,int(30*self.scale_factor),int(30*self.scale_factor)), pygame.Rect(0,0,int(10*self.scale_factor),self.leg_length), pygame.Rect(0,0,int(10*self.scale_factor),self.leg_length)
         self.club_rect, self.club_world_rect = pygame.Rect(0,0,int(10*self.scale_factor),int(40*self.scale_factor)), None
+        self.club_angle = 0 # 휘두르는 중인 몽둥이 각도 (update에서 계산, draw는 그리기만 함)
         self.facing_direction, self.walk_cycle_timer = -1, 0
         self.max_swing_angle, self.swing_angle = 50, 0
         self.direction, self.speed, self.chase_speed, self.jump_power = -1, 1.0, 2.2, -13
@@ -482,6 +489,7 @@ class Enemy(Entity):
         self.attack_range, self.attack_timer, self.attack_cooldown = 45, 0, 120
         self.attack_animation_timer, self.attack_animation_duration = 0, 30
         self.can_see_player = False # ✨ 시야 상태 저장 변수 추가
+        self.path_cell = None # 흐름장을 따라 가고 있는 다음 칸
 
     def jump(self):
         if self.is_on_ground: self.vel.y = self.jump_power; self.is_on_ground = False
@@ -495,23 +503,28 @@ class Enemy(Entity):
             self.swing_angle += (0 - self.swing_angle) * 0.1
             if abs(self.swing_angle) < 0.5: self.swing_angle, self.walk_cycle_timer = 0, 0
             
-    def update(self, tile_rects, player, world_grid):
+    def head_grid_pos(self):
+        return (self.head_rect.centerx // TILE_SIZE, self.head_rect.centery // TILE_SIZE)
+
+    def sight_rays(self, player):
+        """플레이어의 머리, 몸, 발을 향한 시야선 3개의 (시작, 끝) 그리드 좌표 목록."""
+        start_grid_pos = self.head_grid_pos()
+        return [(start_grid_pos, body_grid_pos) for body_grid_pos in player.body_grid_cells()]
+
+    def feet_grid_pos(self):
+        return (self.rect.centerx // TILE_SIZE, (self.rect.bottom - 1) // TILE_SIZE)
+
+    def update(self, player, world, can_see=None, flow_field=None):
+        """
+        can_see: 여러 적의 시야를 한 번에 계산해 둔 결과. 없으면 여기서 직접 계산합니다.
+        flow_field: 모든 적이 같이 쓰는 플레이어 쪽 흐름장. 있으면 추적할 때 길을 따라갑니다.
+        """
         if self.attack_timer > 0: self.attack_timer -= 1
         distance = pygame.math.Vector2(self.rect.center).distance_to(player.rect.center)
-        # 1. 시야 확인을 위한 그리드 좌표들을 가져옵니다.
-        start_grid_pos = (self.head_rect.centerx // TILE_SIZE, self.head_rect.centery // TILE_SIZE)
-        head_grid_pos = (player.head_rect.centerx // TILE_SIZE, player.head_rect.centery // TILE_SIZE)
-        torso_grid_pos = (player.torso_rect.centerx // TILE_SIZE, player.torso_rect.centery // TILE_SIZE)
-        feet_pos = (player.rect.centerx, player.rect.bottom - 5)
-        feet_grid_pos = (feet_pos[0] // TILE_SIZE, feet_pos[1] // TILE_SIZE)
-
-        # 2. world.py의 정확한 함수를 사용하여 세 지점 모두 검사합니다.
-        can_see_head = has_line_of_sight(start_grid_pos, head_grid_pos, world_grid)
-        can_see_torso = has_line_of_sight(start_grid_pos, torso_grid_pos, world_grid)
-        can_see_feet = has_line_of_sight(start_grid_pos, feet_grid_pos, world_grid)
-
-        # 3. 하나라도 보이면 can_see는 True가 됩니다.
-        can_see = can_see_head or can_see_torso or can_see_feet
+        # 머리, 몸, 발 중 하나라도 보이면 can_see는 True가 됩니다.
+        if can_see is None:
+            starts, ends = zip(*self.sight_rays(player))
+            can_see = bool(lines_of_sight(starts, ends, world).any())
         self.can_see_player = can_see
         is_player_in_front = (self.facing_direction * (player.rect.centerx - self.rect.centerx) > 0)
 
@@ -523,7 +536,7 @@ class Enemy(Entity):
                 if is_player_in_front and can_see and distance < self.detection_radius: self.state = 'chase'
             elif self.state == 'chase':
                 if not can_see or distance > self.detection_radius * 1.5: self.state, self.search_timer = 'search', self.search_duration
-                elif self.rect.move(self.direction*20,0).collidelist(tile_rects) == -1 and distance < self.attack_range and self.attack_timer <= 0:
+                elif not world.collides_rect(self.rect.move(self.direction*20,0)) and distance < self.attack_range and self.attack_timer <= 0:
                     self.state, self.attack_animation_timer = 'attack', self.attack_animation_duration
                 else: self.last_seen_pos = player.rect.center
             elif self.state == 'search':
@@ -533,26 +546,54 @@ class Enemy(Entity):
                     if self.search_timer <= 0 or (self.last_seen_pos and self.rect.collidepoint(self.last_seen_pos)): self.state = 'patrol'
 
         self.vel.x = 0
+        # 추적 중이면 흐름장에서 다음에 갈 칸을 가져옴 (길이 없으면 예전처럼 플레이어 쪽으로 곧장 감)
+        # 점프 중이거나 모서리에 걸쳐 있어 서 있는 칸이 없으면 가던 칸을 계속 목표로 삼음
+        feet_grid_pos = self.feet_grid_pos()
+        next_cell = None
+        if flow_field and self.state == 'chase':
+            next_cell = flow_field.next_step(feet_grid_pos)
+            if next_cell is None and self.path_cell != feet_grid_pos:
+                next_cell = self.path_cell
+        self.path_cell = next_cell
         if self.state != 'attack':
             if self.is_on_ground:
-                is_wall = self.rect.move(self.direction * 5, 0).collidelist(tile_rects) != -1
-                is_ground = any(pygame.Rect(self.rect.centerx+(self.rect.width/2+5)*self.direction,self.rect.bottom,5,5).colliderect(t) for t in tile_rects)
+                is_wall = world.collides_rect(self.rect.move(self.direction * 5, 0))
+                is_ground = world.collides_rect(pygame.Rect(self.rect.centerx+(self.rect.width/2+5)*self.direction,self.rect.bottom,5,5))
                 if self.state == 'patrol':
                     self.patrol_turn_timer += 1
                     if self.patrol_turn_timer > self.patrol_turn_interval and random.random()<0.5: self.direction*=-1; self.patrol_turn_timer=0
                     if is_wall: self.jump()
+                elif next_cell:
+                    if is_wall or next_cell[1] < feet_grid_pos[1]: self.jump() # 다음 칸이 더 높으면 점프
                 elif self.state in ['chase', 'search']:
                     if is_wall: self.jump()
                     elif not is_ground and player.rect.centery < self.rect.bottom: self.jump()
             
-            if self.state == 'chase': self.direction = 1 if player.rect.centerx>self.rect.centerx else -1; self.vel.x = self.chase_speed*self.direction
+            if next_cell:
+                # 이미 목표 칸과 같은 열이면 가던 방향 그대로 (모서리를 넘어 떨어지거나 올라서는 중)
+                if next_cell[0] != feet_grid_pos[0]: self.direction = 1 if next_cell[0] > feet_grid_pos[0] else -1
+                self.vel.x = self.chase_speed*self.direction
+            elif self.state == 'chase': self.direction = 1 if player.rect.centerx>self.rect.centerx else -1; self.vel.x = self.chase_speed*self.direction
             elif self.state == 'search':
                 if self.last_seen_pos and abs(self.last_seen_pos[0]-self.rect.centerx)>5:
                     self.direction=1 if self.last_seen_pos[0]>self.rect.centerx else -1; self.vel.x = self.speed*self.direction
             else: self.vel.x = self.speed * self.direction
         
         self.facing_direction = self.direction
-        self.update_physics(tile_rects); self.update_animation()
+        self.update_physics(world); self.update_animation(); self.update_club()
+
+    def update_club(self):
+        """
+        공격 중이면 휘두르는 몽둥이의 각도와 월드 Rect를 계산합니다.
+        플레이어 피격은 이 Rect로 판정하므로 그리기를 건너뛰는 화면 없는 실행에서도 똑같이 맞습니다.
+        """
+        self.torso_rect.bottomleft = self.rect.bottomleft; self.torso_rect.y -= self.leg_length
+        self.club_world_rect, self.club_angle = None, 0
+        if self.state == 'attack':
+            progress = (self.attack_animation_duration - self.attack_animation_timer) / self.attack_animation_duration
+            self.club_angle = math.sin(progress * math.pi) * -90 * self.facing_direction
+            pivot_pos = self.torso_rect.topright if self.facing_direction == 1 else self.torso_rect.topleft
+            self.club_world_rect = pygame.transform.rotate(pygame.Surface(self.club_rect.size), self.club_angle).get_rect(center=pivot_pos)
 
     def draw(self, screen, camera_x, camera_y, player_rect):
         self.torso_rect.bottomleft = self.rect.bottomleft; self.torso_rect.y -= self.leg_length
@@ -579,15 +620,9 @@ class Enemy(Entity):
             pygame.draw.rect(screen, GOBLIN_SKIN, (self.head_rect.x-camera_x, self.head_rect.y-camera_y, self.head_rect.width, self.head_rect.height))
             draw_rotated_limb(self.left_leg_rect, left_hip_pos, -self.swing_angle, GOBLIN_SKIN)
             
-        self.club_world_rect = None
-        if self.state == 'attack':
-            progress = (self.attack_animation_duration - self.attack_animation_timer) / self.attack_animation_duration
-            angle = math.sin(progress * math.pi) * -90 * self.facing_direction
+        if self.club_world_rect: # 휘두르는 중: update_club에서 계산한 각도와 위치로 그림
             club_surf = pygame.Surface(self.club_rect.size, pygame.SRCALPHA); club_surf.fill(CLUB_COLOR)
-            pivot_pos = self.torso_rect.topright if self.facing_direction == 1 else self.torso_rect.topleft
-            rotated_club_surf, club_display_rect = pygame.transform.rotate(club_surf, angle), pygame.transform.rotate(club_surf, angle).get_rect(center=pivot_pos)
-            screen.blit(rotated_club_surf, (club_display_rect.x-camera_x, club_display_rect.y-camera_y))
-            self.club_world_rect = pygame.Rect(club_display_rect.x, club_display_rect.y, club_display_rect.width, club_display_rect.height)
+            screen.blit(pygame.transform.rotate(club_surf, self.club_angle), (self.club_world_rect.x-camera_x, self.club_world_rect.y-camera_y))
         else:
             club_held_rect = self.club_rect.copy()
             if self.facing_direction == 1: club_held_rect.midleft = self.torso_rect.midright
@@ -3,10 +3,21 @@ import sys
 import random
 from config import *
 from entities import *
-from world import get_nearby_tiles
-from utils import has_line_of_sight
+from chunk_loader import ChunkLoader
+from chunk_renderer import ChunkRenderer
+from spatial_hash import SpatialHash
+from visibility import PlayerVisibility
+from pathfinding import FlowField
+from spawner import EnemySpawner
+from particles import ParticleSystem
+from grass import GrassScheduler
+from controls import PygameInput, InputRecorder
+from profiler import FrameProfiler
 from ui import pause_screen, draw_ui, inventory_screen
 
+# 그리기 효과에만 쓰는 난수 (그리기를 건너뛰는 화면 없는 재생에서도 시뮬레이션 난수가 똑같이 소비되도록 따로 둠)
+effect_random = random.Random()
+
 # 블록 파괴 진행도를 시각화하는 함수 (새로 추가)
 def draw_break_progress(screen, target_tile_rect, break_timer, max_break_time, camera_x, camera_y):
     if target_tile_rect is None or break_timer <= 0:
@@ -27,8 +38,8 @@ def draw_break_progress(screen, target_tile_rect, break_timer, max_break_time, c
     for i in range(line_count):
         # 중앙에서 랜덤한 방향으로 짧은 선 그리기
         start_x, start_y = screen_rect.center
-        end_x = start_x + random.randint(-TILE_SIZE // 3, TILE_SIZE // 3)
-        end_y = start_y + random.randint(-TILE_SIZE // 3, TILE_SIZE // 3)
+        end_x = start_x + effect_random.randint(-TILE_SIZE // 3, TILE_SIZE // 3)
+        end_y = start_y + effect_random.randint(-TILE_SIZE // 3, TILE_SIZE // 3)
         pygame.draw.line(screen, WHITE, (start_x, start_y), (end_x, end_y), 2)
     
     # 2단계: 진행도에 따라 중앙에 검은색으로 파인 부분 표현
@@ -37,44 +48,63 @@ def draw_break_progress(screen, target_tile_rect, break_timer, max_break_time, c
     if dig_radius > 0:
         pygame.draw.circle(screen, BLACK, screen_rect.center, dig_radius)
 
-def main_game(map_data, world_name, start_pos=None):
-    MAP_WIDTH = len(map_data[0])
-    MAP_HEIGHT = len(map_data)
-    map_width_pixels = MAP_WIDTH * TILE_SIZE
-    map_height_pixels = MAP_HEIGHT * TILE_SIZE
-
-    # ✨ 1. 전체 크기를 가지지만 비어있는 world_grid를 생성
-    world_grid = [[None for _ in range(MAP_WIDTH)] for _ in range(MAP_HEIGHT)]
-    # ✨ 2. 현재 로드된 청크를 추적하기 위한 set
-    loaded_chunks = set()
+def main_game(world, world_name, start_pos=None, controls=None, profiler=None, save_path=None):
+    """
+    save_path: world를 불러온 저장 파일 (녹화할 때 시작 상태 그대로 녹화 파일에 넣음)
+    controls: 입력 소스 (기본은 실제 키보드/마우스, 화면 없이 돌릴 때는 controls.ScriptedInput, 녹화 재생은 controls.ReplayInput)
+    profiler: 단계별 시간을 잴 FrameProfiler (기본은 Shift 오버레이용 최근 프레임만 기록)
+    """
+    controls = controls or PygameInput()
+    if RECORD_PATH and not controls.scripted: # 실제 플레이를 녹화 (python replay.py로 재생)
+        if save_path is None and world.region_file is not None:
+            save_path = world.region_file.path
+        session = {"world_seed": world.seed, "world_name": world_name, "start_pos": start_pos, "save_path": save_path}
+        controls = InputRecorder(controls, RECORD_PATH, session)
+    if controls.deterministic: # 녹화와 재생이 같은 난수로 시작해야 적 스폰, 잔디, 입자가 똑같이 진행됨
+        random.seed(controls.rng_seed)
+    map_height_pixels = world.height * TILE_SIZE
+
+    # ✨ 청크 준비는 백그라운드 스레드에서 (청크는 처음 필요해질 때 시드로부터 생성됨)
+    chunk_loader = ChunkLoader(world, workers=0 if controls.deterministic else 1) # 녹화/재생은 청크가 들어오는 프레임도 같아야 하므로 기다려서 로드
+    # ✨ 청크를 미리 그려둔 Surface로 타일을 그림
+    chunk_renderer = ChunkRenderer(world)
     ITEM_TO_TILE_TYPE = {
         "dirt": 1,
         "grass": 1, # '잔디' 아이템도 설치 시에는 흙(1)으로 설치됩니다.
         "stone": 3
     }
-    particles, item_drops, grass_spread_timer = [], [], 0
+    particles, item_drops = ParticleSystem(), [] # 블록 부스러기는 배열 하나에 모아 한 번에 업데이트
+    grass = GrassScheduler(world) # 잔디가 번지거나 사라질 수 있는 칸만 따로 모아 둠
+    visibility = PlayerVisibility(world) # 플레이어 기준 시야는 틱마다 시야 맵으로 한 번만 계산
+    flow_field = FlowField(world) # 모든 적이 같이 쓰는 플레이어 쪽 길찾기 결과
+    item_hash = SpatialHash(TILE_SIZE) # 아이템끼리의 충돌 후보를 주변 칸에서만 찾기 위한 색인
+    profiler = profiler or FrameProfiler(PROFILE_CSV) # 루프 단계별 시간 (Shift 오버레이에 표시)
+
+    def wake_items_near(rect):
+        """rect에 닿아 있는 (rect에 받쳐져 있을 수 있는) 잠든 아이템을 깨웁니다."""
+        for item in item_hash.query(rect.inflate(2, 2)):
+            if item.sleeping and item.rect.colliderect(rect.inflate(2, 2)):
+                item.wake()
+
+    def on_tile_change(x, y):
+        # 블록이 사라지거나 놓이면 그 주변에서 잠든 아이템을 깨움
+        wake_items_near(pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE))
+    world.add_tile_listener(on_tile_change)
+
+    def close_game():
+        chunk_loader.shutdown()
+        chunk_renderer.close()
+        grass.close()
+        profiler.close()
+        controls.close() # 녹화 중이면 여기서 파일을 씀
+        world.remove_tile_listener(on_tile_change)
     break_timer = 0
     breaking_tile_coords = None
     player = Player(0, 0, 0, 0)
     if start_pos: player.rect.topleft = start_pos
-    else: player.rect.center = (map_width_pixels / 2, map_height_pixels / 2) # 안전장치
+    else: player.rect.midbottom = (TILE_SIZE // 2, world.surface_y(0) * TILE_SIZE) # 안전장치
     enemies = []
-    
-    enemy = Enemy(600, 0, int(35 * 0.75), int(70 * 0.75))
-    # 적의 시작 y 위치를 땅 위에 맞게 조정
-    col_x = enemy.rect.centerx // TILE_SIZE
-    is_on_ground = False
-    if 0 <= col_x < len(world_grid[0]):
-        # 아래로 내려가면서 첫 번째 땅을 찾음
-        for y in range(len(world_grid)):
-            if world_grid[y][col_x] is not None:
-                # 찾은 땅 위에 적의 발을 맞춤
-                enemy.rect.bottom = world_grid[y][col_x].rect.top
-                is_on_ground = True
-                break
-
-    if is_on_ground:
-        enemies.append(enemy)
+    spawner = EnemySpawner(world) # 로드된 청크에만 적을 두고, 언로드된 청크의 적은 얼려 둠
 
     INTERACTION_RADIUS_X = 3 # 좌우 상호작용 반경
     INTERACTION_RADIUS_Y = 3 # 아래쪽 상호작용 반경
@@ -88,10 +118,20 @@ def main_game(map_data, world_name, start_pos=None):
     highlight_surf_secondary.fill((200, 200, 255, 25))
 
     camera_x, camera_y = 0, 0
+    can_interact = is_tile_solid = False # 첫 프레임에 시뮬레이션 틱이 돌지 않아도 그리기에서 쓸 수 있도록
+    accumulator = 0.0 # 아직 시뮬레이션하지 않은 시간 (ms)
     running = True
     while running:
-        clock.tick(FPS)
-        mouse_pos = pygame.mouse.get_pos()
+        # 화면은 MAX_RENDER_FPS까지 그리고, 시뮬레이션은 아래에서 SIMULATION_STEP_MS 단위로만 진행
+        # 렌더링이 밀려도 게임 속도는 그대로이고, 빠른 컴퓨터에서 더 자주 그려도 물리가 빨라지지 않음
+        # 화면 없이 돌릴 때는 기다리지 않고 프레임마다 정확히 한 틱씩 진행
+        frame_ms = SIMULATION_STEP_MS if HEADLESS else clock.tick(MAX_RENDER_FPS)
+        profiler.begin_frame() # 프레임 시간은 clock.tick에서 기다린 시간을 빼고 잼
+        frame_input = controls.poll(frame_ms) # 이번 프레임의 이벤트, 키, 마우스 상태 (녹화 재생은 녹화 당시의 프레임 시간도)
+        accumulator = min(accumulator + frame_input.frame_ms, SIMULATION_STEP_MS * MAX_STEPS_PER_FRAME)
+        profiler.mark("events")
+        visibility.new_tick()
+        mouse_pos = frame_input.mouse_pos
         mouse_world_pos = (mouse_pos[0] + camera_x, mouse_pos[1] + camera_y)
         mouse_grid_x, mouse_grid_y = int(mouse_world_pos[0] // TILE_SIZE), int(mouse_world_pos[1] // TILE_SIZE)
         selected_tile_rect = pygame.Rect(mouse_grid_x * TILE_SIZE, mouse_grid_y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
@@ -99,46 +139,33 @@ def main_game(map_data, world_name, start_pos=None):
         player_chunk_x = player.rect.centerx // (CHUNK_SIZE * TILE_SIZE)
         load_radius = 2 # 플레이어 주변으로 2청크까지 로드 (화면 + 버퍼)
 
-        required_chunks = set()
-        for y in range(-load_radius, load_radius + 1):
-            for x in range(-load_radius, load_radius + 1):
-                chunk_coord = (player_chunk_x + x, 0) # 2D 청크라면 y도 계산해야 함
-                required_chunks.add(chunk_coord)
-
-        # 4. 더 이상 필요 없는 청크를 언로드 (메모리에서 삭제)
-        chunks_to_unload = loaded_chunks - required_chunks
-        for chunk_x, chunk_y in chunks_to_unload:
-            start_x = chunk_x * CHUNK_SIZE
-            for y in range(MAP_HEIGHT):
-                for x in range(CHUNK_SIZE):
-                    grid_x = start_x + x
-                    if 0 <= grid_x < MAP_WIDTH:
-                        world_grid[y][grid_x] = None
+        required_chunks = {player_chunk_x + x for x in range(-load_radius, load_radius + 1)} # 가로 방향 청크만 사용
+
+        # 4. 백그라운드에서 준비가 끝난 청크를 프레임 시작 때 한 번에 월드에 넣음
+        chunk_loader.swap_in(required_chunks)
+
+        # 5. 더 이상 필요 없는 청크를 언로드 (바뀐 청크는 월드에 보관됨)
+        for chunk_x in set(world.chunks) - required_chunks:
+            world.unload_chunk(chunk_x)
         
-        # 5. 새로 필요한 청크를 로드 (메모리에 생성)
-        chunks_to_load = required_chunks - loaded_chunks
-        for chunk_x, chunk_y in chunks_to_load:
-            start_x = chunk_x * CHUNK_SIZE
-            for y in range(MAP_HEIGHT):
-                for x in range(CHUNK_SIZE):
-                    grid_x = start_x + x
-                    if 0 <= grid_x < MAP_WIDTH:
-                        tile_type = map_data[y][grid_x]
-                        if tile_type != 0:
-                            is_exposed = (y == 0 or map_data[y-1][grid_x] == 0)
-                            block_type = 2 if is_exposed and tile_type == 1 else tile_type
-                            world_grid[y][grid_x] = Tile(grid_x, y, block_type)
-
-        # 6. 로드된 청크 목록 업데이트
-        loaded_chunks = required_chunks
+        # 6. 플레이어가 있는 청크와 양옆 청크는 화면에 바로 보이므로 준비가 안 됐으면 기다려서 로드
+        for chunk_x in range(player_chunk_x - 1, player_chunk_x + 2):
+            chunk_loader.load_now(chunk_x)
+
+        # 7. 나머지 새로 필요한 청크는 백그라운드 스레드에 준비를 맡김 (처음 요청된 청크라면 이때 지형이 생성됨, 음수 좌표도 가능)
+        chunk_loader.request(required_chunks)
+        profiler.mark("chunks")
 
         # ✨ 플레이어의 그리드 좌표를 미리 계산
         player_grid_pos = (player.head_rect.centerx // TILE_SIZE, player.head_rect.centery // TILE_SIZE) # 수정된 코드 (머리 기준)
         mouse_grid_pos = (mouse_grid_x, mouse_grid_y)
         
         # 이벤트 처리
-        for event in pygame.event.get():
+        for event in frame_input.events:
             if event.type == pygame.QUIT:
+                close_game()
+                if HEADLESS or controls.scripted:
+                    return "QUIT"
                 pygame.quit()
                 sys.exit()
                 
@@ -155,20 +182,13 @@ def main_game(map_data, world_name, start_pos=None):
                     is_close_enough = is_horizontally_close and is_vertically_close
                     
                     # 2. 나머지 모든 조건들을 계산
-                    is_valid_grid_pos = 0 <= mouse_grid_y < len(world_grid) and 0 <= mouse_grid_x < len(world_grid[0]) and world_grid[mouse_grid_y][mouse_grid_x] is None
+                    is_valid_grid_pos = world.is_empty(mouse_grid_x, mouse_grid_y)
                     is_not_overlapping_player = not player.rect.colliderect(selected_tile_rect)
-                    is_in_sight = has_line_of_sight(player_grid_pos, mouse_grid_pos, world_grid)
+                    is_in_sight = visibility.can_see(player_grid_pos, mouse_grid_pos)
                     has_item = player.selected_item is not None and player.inventory.get(player.selected_item, 0) > 0 # ✨ 아이템 보유 여부 강화
 
                     # 3. 지지 블록이 있는지 확인
-                    has_support = False
-                    if is_valid_grid_pos:
-                        if mouse_grid_y + 1 < len(world_grid) and world_grid[mouse_grid_y + 1][mouse_grid_x] is not None: has_support = True
-                        else:
-                            for offset in [(0, -1), (1, 0), (-1, 0)]:
-                                check_x, check_y = mouse_grid_x + offset[0], mouse_grid_y + offset[1]
-                                if 0 <= check_y < len(world_grid) and 0 <= check_x < len(world_grid[0]) and world_grid[check_y][check_x] is not None:
-                                    has_support = True; break
+                    has_support = world.has_support(mouse_grid_x, mouse_grid_y)
                     
                     # 4. 최종적으로 모든 조건이 참일 때만 블록을 설치
                     if all([is_valid_grid_pos, is_close_enough, is_not_overlapping_player, has_support, is_in_sight, has_item]):
@@ -177,7 +197,7 @@ def main_game(map_data, world_name, start_pos=None):
                         
                         item_type_to_place = player.selected_item
                         tile_type_to_place = ITEM_TO_TILE_TYPE.get(item_type_to_place, 1)
-                        world_grid[mouse_grid_y][mouse_grid_x] = Tile(mouse_grid_x, mouse_grid_y, tile_type_to_place)
+                        world.set(mouse_grid_x, mouse_grid_y, tile_type_to_place)
                 
                 elif event.button == 4:  # 위로 스크롤
                     player.change_slot(-1)
@@ -190,8 +210,9 @@ def main_game(map_data, world_name, start_pos=None):
                 if event.key == pygame.K_ESCAPE:
                     if player.is_inventory_open: # ✨ 인벤토리가 열려있으면 닫음
                         player.is_inventory_open = False
-                    else: # 아니면 일시정지 메뉴 호출
-                        if pause_screen(world_grid, world_name, player.rect) == "QUIT_TO_TITLE":
+                    elif not controls.scripted: # 아니면 일시정지 메뉴 호출 (메뉴는 실제 마우스로만 조작하므로 재생 중에는 건너뜀)
+                        if pause_screen(world, world_name, player.rect) == "QUIT_TO_TITLE":
+                            close_game()
                             return "TITLE"
                 
                 if event.key == pygame.K_e:
@@ -203,158 +224,152 @@ def main_game(map_data, world_name, start_pos=None):
                     if event.key == pygame.K_3: player.select_slot(2)
                     if event.key == pygame.K_4: player.select_slot(3)
                     if event.key == pygame.K_5: player.select_slot(4)
-        # 업데이트
-        player.update([t.rect for t in get_nearby_tiles(player.rect, world_grid) if t])
+        profiler.mark("events")
+
+        # 업데이트: 지난 프레임 이후 쌓인 시간만큼 고정 간격(한 틱)으로 시뮬레이션 (한 프레임에 여러 번 또는 0번)
+        steps = 0
+        while running and accumulator >= SIMULATION_STEP_MS:
+            accumulator -= SIMULATION_STEP_MS
+            steps += 1
+
+            # 언로드된 청크의 적은 얼리고, 다시 로드된 청크의 적은 되살리고, 부족한 청크에 적을 스폰
+            spawner.update(enemies, player)
+            profiler.mark("enemies")
+            player.update(world, frame_input.keys)
+            # 블록 부수기 시야 확인은 이번 틱에 움직인 뒤의 머리 위치 기준 (프레임 시작 값은 이벤트 처리에만 씀)
+            player_grid_pos = (player.head_rect.centerx // TILE_SIZE, player.head_rect.centery // TILE_SIZE)
+            profiler.mark("player")
         
-        # --- ✨ 아이템 업데이트 로직 최종 수정 ✨ ---
-        all_item_rects = [item.rect for item in item_drops]
-        for item in item_drops:
-            # 1. '생각': 불안정한지 확인해서 회전 속도를 결정
-            supporters = [r for r in all_item_rects if r is not item.rect] + [t.rect for t in get_nearby_tiles(item.rect, world_grid) if t]
-            item.check_stability(supporters)
-
-            # 2. '행동': 결정된 속도를 바탕으로 위치와 각도를 업데이트
-            colliders = [r for r in all_item_rects if r is not item.rect] + [t.rect for t in get_nearby_tiles(item.rect, world_grid) if t]
-            item.update(colliders, player)
-
-        player_body_grid_pos = (player.rect.centerx // TILE_SIZE, player.rect.centery // TILE_SIZE)
-
-        # 플레이어 아이템 획득
-        for item in item_drops[:]:
+            # --- ✨ 아이템 업데이트 로직 최종 수정 ✨ ---
+            # 자석 반경 검사는 깨어 있는 아이템과 플레이어 주변의 잠든 아이템을 모아 배열 연산 한 번으로 처리
+            magnet_candidates = [item for item in item_hash.query(player.rect.inflate(ITEM_MAGNET_RADIUS * 4, ITEM_MAGNET_RADIUS * 4)) if item.sleeping]
+            magnet_candidates += [item for item in item_drops if not item.sleeping]
+            in_magnet = dict(zip(magnet_candidates, magnet_mask([item.rect.center for item in magnet_candidates], player).tolist()))
+            for item in magnet_candidates:
+                if item.sleeping and in_magnet[item]: # 자석 반경에 들어온 잠든 아이템은 깨움
+                    item.wake()
+
+            for item in item_drops:
+                if item.sleeping: # 멈춰 있는 아이템은 물리 업데이트를 건너뜀
+                    continue
+                # 이번 프레임에 움직일 거리 + 밀려날 수 있는 거리(아이템 크기)만큼 넓힌 범위의 주변 아이템만 충돌 후보로 사용
+                reach = int(abs(item.vel.x) + abs(item.vel.y) + item.gravity) + max(item.rect.size)
+                nearby_item_rects = [other.rect for other in item_hash.query(item.rect.inflate(reach * 2, reach * 2)) if other is not item]
+
+                # 1. '생각': 불안정한지 확인해서 회전 속도를 결정
+                item.check_stability(world, nearby_item_rects)
+
+                # 2. '행동': 결정된 속도를 바탕으로 위치와 각도를 업데이트 (블록 충돌은 타일맵에서 직접 확인)
+                old_rect = item.rect.copy()
+                item.update(world, nearby_item_rects, player, in_magnet.get(item)) # 이번 프레임에 도중에 깨어난 아이템은 직접 계산
+                item_hash.update(item)
+                if item.rect != old_rect: # 움직였다면 이 아이템 위에 얹혀 있던 아이템을 깨움
+                    wake_items_near(old_rect)
+
+            particles.update(world)
+
+            player_body_grid_pos = (player.rect.centerx // TILE_SIZE, player.rect.centery // TILE_SIZE)
+
+            # 플레이어 아이템 획득
             # 조건 1: 플레이어와 아이템이 물리적으로 충돌했는가?
-            if player.rect.colliderect(item.rect):
-                
-                # 시야 확인을 위한 기준점 3개 설정
-                head_grid_pos = (player.head_rect.centerx // TILE_SIZE, player.head_rect.centery // TILE_SIZE)
-                torso_grid_pos = (player.torso_rect.centerx // TILE_SIZE, player.torso_rect.centery // TILE_SIZE)
-                feet_pos = (player.rect.centerx, player.rect.bottom - 5) # 발 위치 근사치
-                feet_grid_pos = (feet_pos[0] // TILE_SIZE, feet_pos[1] // TILE_SIZE)
-                
+            touching_items = [item for item in item_hash.query(player.rect) if player.rect.colliderect(item.rect)]
+            # 시야 확인을 위한 기준점 3개 (머리, 몸, 발)
+            body_grid_cells = player.body_grid_cells()
+            for item in touching_items:
                 item_grid_pos = (item.rect.centerx // TILE_SIZE, item.rect.centery // TILE_SIZE)
 
-                # 조건 2: 머리, 몸, 발 중 하나라도 시야가 확보되었는가?
-                is_sight_clear = (
-                    has_line_of_sight(head_grid_pos, item_grid_pos, world_grid) or
-                    has_line_of_sight(torso_grid_pos, item_grid_pos, world_grid) or
-                    has_line_of_sight(feet_grid_pos, item_grid_pos, world_grid)
-                )
-
-                if is_sight_clear:
+                # 조건 2: 머리, 몸, 발 중 하나라도 시야가 확보되었는가? (시야 맵 조회)
+                if visibility.any_can_see(body_grid_cells, item_grid_pos):
                     # ✨ 1. 아이템 개수 추가
                     item_type = item.item_type
                     player.inventory[item_type] = player.inventory.get(item_type, 0) + 1
-                    
+                
                     # ✨ 2. 핫바에 아이템 추가 시도
                     player.add_item_to_hotbar(item_type)
-                    
+                
                     item_drops.remove(item)
-
-        # --- ▼▼▼ 적-플레이어 충돌 확인 코드 추가 ▼▼▼ ---
-        for enemy in enemies:
-            # 1. 적 주변의 타일 정보를 가져옵니다 (update에 필요).
-            nearby_tile_rects = [t.rect for t in get_nearby_tiles(enemy.rect, world_grid) if t]
-            
-            # 2. 적의 상태를 업데이트합니다 (player 객체 전체를 전달).
-            # 이 안에서 시야 확인(머리,몸,발)이 모두 이루어집니다.
-            enemy.update(nearby_tile_rects, player, world_grid) # ✨ world_grid 추가
+                    item_hash.remove(item)
+                    wake_items_near(item.rect)
+
+            profiler.mark("items")
+
+            # --- ▼▼▼ 적-플레이어 충돌 확인 코드 추가 ▼▼▼ ---
+            if enemies:
+                flow_field.update(player.rect) # 플레이어가 다른 칸으로 움직였거나 타일이 바뀐 경우에만 다시 계산
+            for enemy in enemies:
+                # 1. 적의 상태를 업데이트합니다 (player 객체 전체를 전달).
+                # 적이 플레이어를 볼 수 있는지는 플레이어의 머리, 몸, 발에서 본 시야 맵으로 확인합니다.
+                can_see = visibility.any_can_see(body_grid_cells, enemy.head_grid_pos())
+                enemy.update(player, world, can_see, flow_field)
             
-            # 3. 만약 적이 공격 중이고 몽둥이가 플레이어와 닿았다면 데미지를 줍니다.
-            if enemy.club_world_rect and player.rect.colliderect(enemy.club_world_rect):
-                player.take_damage(ENEMY_DAMAGE)
+                # 2. 만약 적이 공격 중이고 몽둥이가 플레이어와 닿았다면 데미지를 줍니다.
+                if enemy.club_world_rect and player.rect.colliderect(enemy.club_world_rect):
+                    player.take_damage(ENEMY_DAMAGE)
         
-        # 블록 파괴
-        mouse_buttons = pygame.mouse.get_pressed()
-        player_left_grid = player.rect.left // TILE_SIZE
-        player_right_grid = player.rect.right // TILE_SIZE
-        player_top_grid = player.rect.top // TILE_SIZE
-        player_bottom_grid = player.rect.bottom // TILE_SIZE
+            profiler.mark("enemies")
 
-        is_horizontally_close = (player_left_grid - INTERACTION_RADIUS_X <= mouse_grid_x <= player_right_grid + INTERACTION_RADIUS_X)
-        is_vertically_close = (player_top_grid - (INTERACTION_RADIUS_Y + EXTRA_REACH_UP) <= mouse_grid_y <= player_bottom_grid + INTERACTION_RADIUS_Y)
-        can_interact = is_horizontally_close and is_vertically_close
-        is_tile_solid = 0 <= mouse_grid_y < len(world_grid) and 0 <= mouse_grid_x < len(world_grid[0]) and world_grid[mouse_grid_y][mouse_grid_x] is not None
-        is_in_sight_for_break = has_line_of_sight(player_grid_pos, mouse_grid_pos, world_grid)
-
-        if mouse_buttons[0] and can_interact and is_tile_solid and is_in_sight_for_break:
-            player.start_breaking() # ✨ 애니메이션 시작
-            current_breaking_coords = (mouse_grid_x, mouse_grid_y)
-            if breaking_tile_coords != current_breaking_coords:
-                breaking_tile_coords = current_breaking_coords
-                break_timer = MAX_BREAK_TIME
-            break_timer -= 1
-            if break_timer <= 0:
-                tile_to_break = world_grid[mouse_grid_y][mouse_grid_x]
-                # 부서진 블록 타입에 따라 드랍할 아이템 결정
-                if tile_to_break.type == 3: # 돌
-                    item_to_drop = "stone"
-                else: # 흙 또는 잔디
-                    item_to_drop = "dirt"
+            # 블록 파괴
+            mouse_buttons = frame_input.mouse_buttons
+            player_left_grid = player.rect.left // TILE_SIZE
+            player_right_grid = player.rect.right // TILE_SIZE
+            player_top_grid = player.rect.top // TILE_SIZE
+            player_bottom_grid = player.rect.bottom // TILE_SIZE
+
+            is_horizontally_close = (player_left_grid - INTERACTION_RADIUS_X <= mouse_grid_x <= player_right_grid + INTERACTION_RADIUS_X)
+            is_vertically_close = (player_top_grid - (INTERACTION_RADIUS_Y + EXTRA_REACH_UP) <= mouse_grid_y <= player_bottom_grid + INTERACTION_RADIUS_Y)
+            can_interact = is_horizontally_close and is_vertically_close
+            is_tile_solid = world.is_solid(mouse_grid_x, mouse_grid_y)
+            is_in_sight_for_break = visibility.can_see(player_grid_pos, mouse_grid_pos)
+
+            if mouse_buttons[0] and can_interact and is_tile_solid and is_in_sight_for_break:
+                player.start_breaking() # ✨ 애니메이션 시작
+                current_breaking_coords = (mouse_grid_x, mouse_grid_y)
+                if breaking_tile_coords != current_breaking_coords:
+                    breaking_tile_coords = current_breaking_coords
+                    break_timer = MAX_BREAK_TIME
+                break_timer -= 1
+                if break_timer <= 0:
+                    # 부서진 블록 타입에 따라 드랍할 아이템 결정
+                    if world.get(mouse_grid_x, mouse_grid_y) == 3: # 돌
+                        item_to_drop = "stone"
+                    else: # 흙 또는 잔디
+                        item_to_drop = "dirt"
+                    particles.burst(selected_tile_rect.centerx, selected_tile_rect.centery, STONE_COLOR if item_to_drop == "stone" else DIRT_COLOR)
                 
-                item_drops.append(ItemDrop(tile_to_break.rect.centerx, tile_to_break.rect.centery, item_to_drop))
-                world_grid[mouse_grid_y][mouse_grid_x] = None
+                    item_drops.append(ItemDrop(selected_tile_rect.centerx, selected_tile_rect.centery, item_to_drop))
+                    item_hash.insert(item_drops[-1])
+                    world.set(mouse_grid_x, mouse_grid_y, 0)
+                    breaking_tile_coords = None; break_timer = 0
+            else:
+                player.stop_breaking() # ✨ 애니메이션 중지
                 breaking_tile_coords = None; break_timer = 0
-        else:
-            player.stop_breaking() # ✨ 애니메이션 중지
-            breaking_tile_coords = None; break_timer = 0
 
-        # 그리기
+            profiler.mark("breaking")
+
+            # --- ▼▼▼ 플레이어 사망 확인 코드 추가 ▼▼▼ ---
+            if player.health <= 0:
+                running = False # 루프를 중단시켜 사망 애니메이션으로 넘어감
+
+            # 월드 업데이트 (잔디 성장 및 소멸): 로드된 청크 전체의 후보 칸 중 일부만 이번 틱에 처리
+            grass.update()
+            profiler.mark("grass")
+
+        # 그리기 (시뮬레이션이 끝난 최신 상태를 그림)
         camera_x = player.rect.centerx - SCREEN_WIDTH / 2
         camera_y = player.rect.centery - SCREEN_HEIGHT / 2
-        camera_x = max(0, min(camera_x, map_width_pixels - SCREEN_WIDTH))
         camera_y = max(0, min(camera_y, map_height_pixels - SCREEN_HEIGHT))
+        if HEADLESS:
+            profiler.end_frame(steps)
+            continue
         screen.fill(SKY_COLOR)
-        start_col, end_row = max(0, int(camera_x // TILE_SIZE)), min(len(world_grid), int((camera_y + SCREEN_HEIGHT) // TILE_SIZE) + 2)
-        end_col = min(len(world_grid[0]), int((camera_x + SCREEN_WIDTH) // TILE_SIZE) + 2)
-        start_row = max(0, int(camera_y // TILE_SIZE))
-
-        # --- ▼▼▼ 플레이어 사망 확인 코드 추가 ▼▼▼ ---
-        if player.health <= 0:
-            running = False # 루프를 중단시켜 사망 애니메이션으로 넘어감
-
-        # 월드 업데이트 (잔디 성장 및 소멸)
-        grass_spread_timer += 1
-        
-        # 1. 잔디 성장 로직
-        if grass_spread_timer >= GRASS_SPREAD_COOLDOWN:
-            grass_spread_timer = 0
-            
-            # 화면에 보이는 모든 타일을 순회하며 잔디를 찾음
-            for y in range(start_row, end_row):
-                for x in range(start_col, end_col):
-                    tile = world_grid[y][x]
-                    if tile and tile.type == 2: # 잔디 블록이라면
-                        # 주변 흙 블록(type==1)을 찾아 일정 확률로 잔디로 바꿈
-                        for offset in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                            nx, ny = x + offset[0], y + offset[1]
-                            if 0 <= ny < len(world_grid) and 0 <= nx < len(world_grid[0]):
-                                neighbor_tile = world_grid[ny][nx]
-                                # 이웃이 흙이고, 그 위가 비어있어야 함
-                                if neighbor_tile and neighbor_tile.type == 1 and (ny == 0 or world_grid[ny-1][nx] is None):
-                                    if random.random() < 0.2: # 20% 확률로 전파
-                                        neighbor_tile.type = 2
-                                        break # 한 번만 전파
-        
-        # 2. 잔디 소멸 로직
-        # 화면에 보이는 모든 타일을 순회
-        for y in range(start_row, end_row):
-            for x in range(start_col, end_col):
-                tile = world_grid[y][x]
-                if tile and tile.type == 2: # 잔디 블록이라면
-                    is_covered = y > 0 and world_grid[y-1][x] is not None
-                    if is_covered:
-                        tile.time_covered += 1
-                        if tile.time_covered > GRASS_DECAY_TIME:
-                            tile.type = 1 # 흙으로 변경
-                            tile.time_covered = 0
-                    else:
-                        tile.time_covered = 0 # 덮여있지 않으면 타이머 리셋
-        for y in range(start_row, end_row):
-            for x in range(start_col, end_col):
-                if world_grid[y][x]: world_grid[y][x].draw(screen, camera_x, camera_y, world_grid, x, y)
+        chunk_renderer.draw(screen, camera_x, camera_y)
+        profiler.mark("tiles")
         for item in item_drops: item.draw(screen, camera_x, camera_y)
+        particles.draw(screen, camera_x, camera_y)
         player.draw(screen, camera_x, camera_y)
         for enemy in enemies:
             enemy.draw(screen, camera_x, camera_y, player.rect)
+        profiler.mark("sprites")
         if player.inventory.get(player.selected_item, 0) > 0:
             # 1. 설치 가능 여부를 판단하기 위한 모든 조건을 계산합니다.
             
@@ -368,21 +383,12 @@ def main_game(map_data, world_name, start_pos=None):
             is_close_enough = is_horizontally_close and is_vertically_close
 
             # 기타 조건
-            is_empty_tile = 0 <= mouse_grid_y < len(world_grid) and 0 <= mouse_grid_x < len(world_grid[0]) and world_grid[mouse_grid_y][mouse_grid_x] is None
+            is_empty_tile = world.is_empty(mouse_grid_x, mouse_grid_y)
             is_not_overlapping = not player.rect.colliderect(selected_tile_rect)
-            is_in_sight = has_line_of_sight(player_grid_pos, mouse_grid_pos, world_grid)
+            is_in_sight = visibility.can_see(player_grid_pos, mouse_grid_pos)
 
             # 지지 블록 조건
-            has_support = False
-            if is_empty_tile:
-                if mouse_grid_y + 1 < len(world_grid) and world_grid[mouse_grid_y + 1][mouse_grid_x] is not None:
-                    has_support = True
-                else:
-                    for offset in [(0, -1), (1, 0), (-1, 0)]:
-                        check_x, check_y = mouse_grid_x + offset[0], mouse_grid_y + offset[1]
-                        if 0 <= check_y < len(world_grid) and 0 <= check_x < len(world_grid[0]) and world_grid[check_y][check_x] is not None:
-                            has_support = True
-                            break
+            has_support = world.has_support(mouse_grid_x, mouse_grid_y)
             
             # 2. 모든 조건을 종합하여 최종적으로 설치 가능한지(can_place_preview)를 결정합니다.
             can_place_preview = all([is_close_enough, is_empty_tile, is_not_overlapping, is_in_sight, has_support])
@@ -406,7 +412,7 @@ def main_game(map_data, world_name, start_pos=None):
         player_bottom_grid = player.rect.bottom // TILE_SIZE
         
         # Shift 키가 눌렸는지 확인
-        keys = pygame.key.get_pressed()
+        keys = frame_input.keys
         show_interaction_box_and_xy = keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT]
 
         # Shift 키를 누르고 있을 때만 상호작용 박스와 좌표를 그림
@@ -424,7 +430,7 @@ def main_game(map_data, world_name, start_pos=None):
             # 범위 내 모든 타일에 하나의 통일된 하이라이트를 그림
             for y in range(start_reach_y, end_reach_y + 1):
                 for x in range(start_reach_x, end_reach_x + 1):
-                    if 0 <= y < len(world_grid) and 0 <= x < len(world_grid[0]):
+                    if 0 <= y < world.height:
                         # ✨ 더 간단한 표시를 위해 secondary 하이라이트만 사용
                         screen.blit(highlight_surf_secondary, (x * TILE_SIZE - camera_x, y * TILE_SIZE - camera_y))
             # 좌표 표시
@@ -441,6 +447,9 @@ def main_game(map_data, world_name, start_pos=None):
             # 3. 화면 우측 상단에 텍스트를 그립니다.
             screen.blit(pixel_text_surf, (SCREEN_WIDTH - pixel_text_surf.get_width() - 10, 10))
             screen.blit(grid_text_surf, (SCREEN_WIDTH - grid_text_surf.get_width() - 10, 10 + pixel_text_surf.get_height()))
+
+            # 4. 그 아래에 단계별 시간 (최근 프레임 평균 / p99, ms)과 프레임 시간 그래프를 그립니다.
+            profiler.draw(screen, small_font, SCREEN_WIDTH - 290, 20 + pixel_text_surf.get_height() * 2)
         # 설치 미리보기 로직
         # 1. 선택된 아이템이 있고, 그 아이템을 1개 이상 가지고 있을 때만 미리보기를 그림
         if player.selected_item is not None and player.inventory.get(player.selected_item, 0) > 0:
@@ -454,18 +463,11 @@ def main_game(map_data, world_name, start_pos=None):
             is_vertically_close = (player_top_grid - (INTERACTION_RADIUS_Y + EXTRA_REACH_UP) <= mouse_grid_y <= player_bottom_grid + INTERACTION_RADIUS_Y)
             is_close_enough = is_horizontally_close and is_vertically_close
             
-            is_empty_tile = 0 <= mouse_grid_y < len(world_grid) and 0 <= mouse_grid_x < len(world_grid[0]) and world_grid[mouse_grid_y][mouse_grid_x] is None
+            is_empty_tile = world.is_empty(mouse_grid_x, mouse_grid_y)
             is_not_overlapping = not player.rect.colliderect(selected_tile_rect)
-            is_in_sight = has_line_of_sight(player_grid_pos, mouse_grid_pos, world_grid)
-
-            has_support = False
-            if is_empty_tile:
-                if mouse_grid_y + 1 < len(world_grid) and world_grid[mouse_grid_y + 1][mouse_grid_x] is not None: has_support = True
-                else:
-                    for offset in [(0, -1), (1, 0), (-1, 0)]:
-                        check_x, check_y = mouse_grid_x + offset[0], mouse_grid_y + offset[1]
-                        if 0 <= check_y < len(world_grid) and 0 <= check_x < len(world_grid[0]) and world_grid[check_y][check_x] is not None:
-                            has_support = True; break
+            is_in_sight = visibility.can_see(player_grid_pos, mouse_grid_pos)
+
+            has_support = world.has_support(mouse_grid_x, mouse_grid_y)
             
             # 3. 모든 조건을 종합하여 최종적으로 설치 가능한지(can_place_preview)를 결정
             can_place_preview = all([is_close_enough, is_empty_tile, is_not_overlapping, is_in_sight, has_support])
@@ -478,7 +480,7 @@ def main_game(map_data, world_name, start_pos=None):
 
         # --- ✨ 디버깅용 시야 레이저 그리기 시작 ✨ ---
         # 1. 플레이어와 마우스 위치 사이에 시야가 확보되었는지 확인합니다.
-        is_sight_clear = has_line_of_sight(player_grid_pos, mouse_grid_pos, world_grid)
+        is_sight_clear = visibility.can_see(player_grid_pos, mouse_grid_pos)
         
         # 2. 시야 확보 여부에 따라 색상을 결정합니다 (초록: 확보, 빨강: 막힘).
         laser_color = (0, 255, 0) if is_sight_clear else (255, 0, 0)
@@ -492,12 +494,21 @@ def main_game(map_data, world_name, start_pos=None):
         pygame.draw.line(screen, laser_color, start_laser_pos, end_laser_pos, 2)
         # --- 디버깅용 시야 레이저 그리기 끝 ---
 
+        profiler.mark("previews")
+
         # 인벤토리가 열려있을 때만 inventory_screen을 호출하여 그림
         if player.is_inventory_open:
             inventory_screen(screen, player) # ✨ 수정된 inventory_screen 함수 호출 (clock 인자 삭제)
 
         draw_ui(player)
         pygame.display.update()
+        profiler.mark("ui")
+        profiler.end_frame(steps)
+
+    if HEADLESS: # 사망 애니메이션은 건너뜀
+        close_game()
+        return "GAME_OVER"
+    chunk_loader.shutdown()
 
     # 사망 애니메이션
     # 1. 죽는 순간의 신체 부위별 정확한 위치를 계산합니다.
@@ -523,35 +534,30 @@ def main_game(map_data, world_name, start_pos=None):
     final_right_leg_rect = player.right_leg_rect.copy()
     final_right_leg_rect.midtop = right_hip_pos
 
-    # 2. 계산된 위치를 기반으로 Debris 객체를 생성합니다.
-    debris = [Debris(r.x, r.y, r.w, r.h, c) for r, c in [
+    # 2. 계산된 위치를 기반으로 파편을 만듭니다. (수명 -1: 사라지지 않음)
+    debris = ParticleSystem()
+    for r, c in [
         (player.head_rect, (255,220,180)), 
         (player.torso_rect, (0,0,255)),
         (final_left_arm_rect, (255,200,160)), 
         (final_right_arm_rect, (255,220,180)), 
         (final_left_leg_rect, (40,40,40)), 
         (final_right_leg_rect, (60,60,60))
-    ]]
+    ]:
+        debris.add([r.x, r.y], [random.uniform(-8, 8), random.uniform(-15, -5)], [r.w, r.h], c)
     
     # 3. 애니메이션을 재생합니다. (이하 코드는 동일)
     for _ in range(240):
         # 1. 모든 파편 조각을 업데이트합니다.
-        for d in debris:
-            # 각 파편 주변의 지형을 감지하여 충돌 정보로 넘겨줍니다.
-            colliders = [t.rect for t in get_nearby_tiles(d.rect, world_grid) if t]
-            d.update(colliders)
+        # 모든 파편의 중력, 타일 충돌, 마찰을 한 번에 계산합니다.
+        debris.update(world)
         
         # 2. 화면을 다시 그립니다. (이하 코드는 동일)
         screen.fill(SKY_COLOR)
-        start_col_death = max(0, int(camera_x // TILE_SIZE))
-        end_col_death = min(len(world_grid[0]), int((camera_x + SCREEN_WIDTH) // TILE_SIZE) + 2)
-        start_row_death = max(0, int(camera_y // TILE_SIZE))
-        end_row_death = min(len(world_grid), int((camera_y + SCREEN_HEIGHT) // TILE_SIZE) + 2)
-        for y in range(start_row_death, end_row_death):
-            for x in range(start_col_death, end_col_death):
-                if world_grid[y][x]: world_grid[y][x].draw(screen, camera_x, camera_y, world_grid, x, y)
-        for d in debris: d.draw(screen, camera_x, camera_y)
+        chunk_renderer.draw(screen, camera_x, camera_y)
+        debris.draw(screen, camera_x, camera_y)
         draw_ui(player)
         pygame.display.update(); clock.tick(FPS)
     
+    close_game()
     return "GAME_OVER"
\ No newline at end of file
@@ -0,0 +1,131 @@
+# grass.py
+# 잔디 전파/소멸을 화면 스캔 대신 "후보 칸 목록"으로 처리하는 스케줄러.
+# - 전파 후보: 위가 비어 있고 옆(상하좌우)에 잔디가 있는 흙
+# - 소멸 예약: 위가 막힌 잔디 (덮인 시점부터 GRASS_DECAY_TIME 틱 뒤에 흙으로 바뀜)
+# 후보는 청크가 로드될 때 한 번 배열 연산으로 찾고, 그 뒤로는 타일이 바뀐 칸 주변만 다시 확인합니다.
+# 로드된 모든 청크에서 진행되고 (화면 밖 포함), 한 틱에 처리하는 칸 수는 GRASS_MAX_UPDATES_PER_TICK 으로 제한됩니다.
+
+import heapq
+import random
+import numpy as np
+from config import CHUNK_SIZE, GRASS_SPREAD_COOLDOWN, GRASS_DECAY_TIME, GRASS_SPREAD_CHANCE, GRASS_MAX_UPDATES_PER_TICK
+from terrain import DIRT, GRASS
+
+NEIGHBOR_OFFSETS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+
+class GrassScheduler:
+    def __init__(self, world):
+        self.world = world
+        self.tick = 0
+        self.known_chunks = set() # 후보를 찾아 둔 청크
+        self.spread_cells = [] # 전파 후보 (무작위로 고르기 위해 리스트 + 위치 사전으로 관리)
+        self.spread_index = {} # {(x, y): spread_cells 안의 위치}
+        self.spread_budget = 0.0 # 이번 틱까지 쌓인 전파 시도 횟수 (소수점 이하는 다음 틱으로 넘김)
+        self.decay_due = {} # {(x, y): 흙으로 바뀔 틱}
+        self.decay_queue = [] # (흙으로 바뀔 틱, x, y) 힙. 덮개가 치워진 칸은 꺼낼 때 건너뜀
+        world.add_tile_listener(self.on_tile_change)
+
+    def close(self):
+        self.world.remove_tile_listener(self.on_tile_change)
+
+    def update(self):
+        """시뮬레이션 틱마다 호출합니다."""
+        self.tick += 1
+        self._sync_chunks()
+        budget = GRASS_MAX_UPDATES_PER_TICK
+
+        # 1. 소멸: 예약 시간이 된 덮인 잔디를 흙으로
+        while self.decay_queue and self.decay_queue[0][0] <= self.tick and budget > 0:
+            due, x, y = heapq.heappop(self.decay_queue)
+            if self.decay_due.get((x, y)) == due:
+                budget -= 1
+                self.world.set(x, y, DIRT) # 바뀐 칸 주변은 on_tile_change에서 다시 확인
+
+        # 2. 전파: 후보마다 평균 GRASS_SPREAD_COOLDOWN 틱에 한 번 시도되도록 무작위로 골라 GRASS_SPREAD_CHANCE 확률로 잔디로 바꿈
+        self.spread_budget += len(self.spread_cells) / GRASS_SPREAD_COOLDOWN
+        attempts = min(int(self.spread_budget), budget)
+        self.spread_budget -= int(self.spread_budget)
+        for _ in range(attempts):
+            if not self.spread_cells:
+                break
+            x, y = random.choice(self.spread_cells)
+            if not self._can_spread(x, y): # 옆 잔디가 있던 청크가 언로드된 경우 등
+                self._remove_spread(x, y)
+            elif random.random() < GRASS_SPREAD_CHANCE:
+                self.world.set(x, y, GRASS)
+
+    def on_tile_change(self, x, y):
+        # (x, y)가 바뀌면 그 칸과 상하좌우 칸의 후보 여부가 달라질 수 있음
+        self._refresh(x, y)
+        for dx, dy in NEIGHBOR_OFFSETS:
+            self._refresh(x + dx, y + dy)
+
+    def _can_spread(self, x, y):
+        world = self.world
+        return (world.get(x, y) == DIRT and (y == 0 or not world.is_solid(x, y - 1))
+                and any(world.get(x + dx, y + dy) == GRASS for dx, dy in NEIGHBOR_OFFSETS))
+
+    def _refresh(self, x, y):
+        if self._can_spread(x, y):
+            self._add_spread(x, y)
+        else:
+            self._remove_spread(x, y)
+
+        if self.world.get(x, y) == GRASS and y > 0 and self.world.is_solid(x, y - 1):
+            if (x, y) not in self.decay_due:
+                self._schedule_decay(x, y)
+        else:
+            self.decay_due.pop((x, y), None)
+
+    def _sync_chunks(self):
+        loaded = self.world.chunks.keys()
+        for chunk_x in self.known_chunks - loaded:
+            self._forget_chunk(chunk_x)
+        for chunk_x in loaded - self.known_chunks:
+            self._scan_chunk(chunk_x)
+        self.known_chunks = set(loaded)
+
+    def _scan_chunk(self, chunk_x):
+        """새로 로드된 청크 (와 맞닿은 이웃 청크의 가장자리 열)에서 후보를 배열 연산으로 찾습니다."""
+        x0 = chunk_x * CHUNK_SIZE - 1
+        types = self.world.region(x0, 0, x0 + CHUNK_SIZE + 2, self.world.height)
+        grass = types == GRASS
+        covered = np.zeros(types.shape, dtype=bool)
+        covered[1:] = types[:-1] != 0
+        near_grass = np.zeros(types.shape, dtype=bool)
+        near_grass[:, 1:] |= grass[:, :-1]
+        near_grass[:, :-1] |= grass[:, 1:]
+        near_grass[1:] |= grass[:-1]
+        near_grass[:-1] |= grass[1:]
+
+        for y, col in zip(*np.nonzero((types == DIRT) & ~covered & near_grass)):
+            self._add_spread(x0 + int(col), int(y))
+        for y, col in zip(*np.nonzero(grass[:, 1:-1] & covered[:, 1:-1])):
+            if (x0 + 1 + int(col), int(y)) not in self.decay_due:
+                self._schedule_decay(x0 + 1 + int(col), int(y))
+
+    def _forget_chunk(self, chunk_x):
+        # 덮인 시간은 저장하지 않으므로 다시 로드되면 처음부터 다시 셈
+        for cell in [cell for cell in self.spread_index if cell[0] // CHUNK_SIZE == chunk_x]:
+            self._remove_spread(*cell)
+        for cell in [cell for cell in self.decay_due if cell[0] // CHUNK_SIZE == chunk_x]:
+            self.decay_due.pop(cell)
+
+    def _schedule_decay(self, x, y):
+        due = self.tick + GRASS_DECAY_TIME + 1 # 기존처럼 GRASS_DECAY_TIME 틱을 넘게 덮여 있으면 소멸
+        self.decay_due[(x, y)] = due
+        heapq.heappush(self.decay_queue, (due, x, y))
+
+    def _add_spread(self, x, y):
+        if (x, y) not in self.spread_index:
+            self.spread_index[(x, y)] = len(self.spread_cells)
+            self.spread_cells.append((x, y))
+
+    def _remove_spread(self, x, y):
+        index = self.spread_index.pop((x, y), None)
+        if index is None:
+            return
+        last = self.spread_cells.pop()
+        if index < len(self.spread_cells): # 지운 자리에 마지막 칸을 옮겨 채움
+            self.spread_cells[index] = last
+            self.spread_index[last] = index
@@ -0,0 +1,39 @@
+# headless.py
+# 창과 오디오 장치 없이 main_game을 돌리는 실행기 (부하 테스트, CI 벤치마크, 서버 쪽 시뮬레이션용).
+# 그리기는 건너뛰고, 미리 정한 입력으로 물리, 적 AI, 잔디, 청크 로딩을 기다림 없이 최대한 빨리 진행합니다.
+#
+# 사용법: python headless.py --seed 7 --frames 3600 --hold d --jump-every 40
+
+import os
+os.environ["GRIDSHIFT_HEADLESS"] = "1" # config를 import하기 전에 설정해야 함
+
+import argparse
+import time
+import pygame
+from config import TILE_SIZE
+from world import World
+from game import main_game
+from controls import hold_keys
+
+def run_headless(world, controls, start_x=0):
+    """start_x 열의 지표면 위에서 시작해 controls의 입력이 끝날 때까지 게임을 돌리고, main_game의 결과를 돌려줍니다."""
+    start_pos = (start_x * TILE_SIZE, (world.surface_y(start_x) - 3) * TILE_SIZE)
+    return main_game(world, "headless", start_pos=start_pos, controls=controls)
+
+def main():
+    parser = argparse.ArgumentParser(description="화면 없이 게임 월드를 시뮬레이션합니다.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--frames", type=int, default=3600, help="진행할 프레임(틱) 수")
+    parser.add_argument("--start-x", type=int, default=0, help="시작 열")
+    parser.add_argument("--hold", default="", help="계속 누르고 있을 키 (예: d)")
+    parser.add_argument("--jump-every", type=int, default=None, help="이 프레임마다 점프")
+    args = parser.parse_args()
+
+    controls = hold_keys(args.frames, [pygame.key.key_code(key) for key in args.hold], args.jump_every)
+    started = time.perf_counter()
+    result = run_headless(World.from_save_data({"seed": args.seed}), controls, args.start_x)
+    elapsed = time.perf_counter() - started
+    print(f"{result}: {controls.frame} 프레임, {elapsed:.2f}초 ({controls.frame / elapsed:.0f} 프레임/초)")
+
+if __name__ == '__main__':
+    main()
@@ -2,12 +2,13 @@ import os
 import random
 from config import *
 from ui import title_screen, play_menu_screen, world_creation_screen, load_selection_screen, game_over_screen, loading_screen
-from world import generate_map_data, create_world_grid, load_map
+from world import World, load_map
 from game import main_game
 
 def run_game():
     game_state = "TITLE"
-    world_grid, world_name, player_start_pos = None, None, None
+    world_name, player_start_pos = None, None
+    save_path = None # 불러온 저장 파일 경로 (새로 만든 월드는 None, 녹화할 때 시작 월드를 같이 저장하기 위함)
     loaded_data = None # 재시작 시 초기 위치를 기억하기 위함
 
     while True:
@@ -26,10 +27,10 @@ def run_game():
                 loading_screen(STRINGS.get("loading_world", "월드 불러오는 중..."))
                 loaded_data = load_map(result)
 
-                if loaded_data and "map_data" in loaded_data:
-                    world_grid = create_world_grid(loaded_data["map_data"])
+                if loaded_data and ("region" in loaded_data or "map_data" in loaded_data):
                     player_start_pos = loaded_data.get("player_pos")
-                    world_name = os.path.basename(result).replace(".json", "")
+                    world_name = os.path.splitext(os.path.basename(result))[0]
+                    save_path = result
                     game_state = "GAMEPLAY"
 
                 else: game_state = "TITLE" # 로드 실패
@@ -40,30 +41,22 @@ def run_game():
             if result:
                 world_name, seed = result
                 loading_screen(f"'{world_name}' 생성 중...")
-                # 1. 맵 너비를 10000으로 늘려 거대한 맵 데이터 생성
-                MAP_WIDTH, MAP_HEIGHT = 10000, 80
-                map_data = generate_map_data(MAP_WIDTH, MAP_HEIGHT, seed, 0.05, 4)
-                
-                # 2. 'world_grid'는 여기서 만들지 않음! create_world_grid 호출 삭제
-                # world_grid = create_world_grid(map_data) # <- 이 줄 삭제
+                # 1. 맵을 미리 만들지 않음! 청크는 게임 중 처음 필요해질 때 시드로부터 생성됨
+                loaded_data = {"seed": seed} # ✨ 가벼운 시드만 전달하기 위해 저장
+                save_path = None
 
-                # 3. 플레이어 시작 위치 찾기 (map_data 기준)
-                player_start_pos = None
-                spawn_x_col = random.randint(2500, 7500) # 스폰 위치
-                for y in range(MAP_HEIGHT):
-                    if map_data[y][spawn_x_col] != 0:
-                        player_start_pos = (spawn_x_col * TILE_SIZE, (y - 3) * TILE_SIZE)
-                        break
-                
-                loaded_data = {"map_data": map_data} # ✨ 가벼운 map_data를 전달하기 위해 저장
+                # 2. 플레이어 시작 위치 찾기 (스폰 열의 지형만 계산)
+                spawn_x_col = random.randint(-CHUNK_SIZE * 4, CHUNK_SIZE * 4) # 스폰 위치
+                surface_y = World.from_save_data(loaded_data).surface_y(spawn_x_col)
+                player_start_pos = (spawn_x_col * TILE_SIZE, (surface_y - 3) * TILE_SIZE)
                 game_state = "GAMEPLAY"
             else:
                 game_state = "PLAY_MENU"
 
         elif game_state == "GAMEPLAY":
-            # main_game에 world_grid 대신 map_data를 전달
-            if loaded_data and "map_data" in loaded_data:
-                game_state = main_game(loaded_data["map_data"], world_name, start_pos=player_start_pos)
+            # main_game에 저장 데이터(또는 시드)로 만든 월드를 전달 (재시작하면 처음 상태로 다시 만듦)
+            if loaded_data:
+                game_state = main_game(World.from_save_data(loaded_data), world_name, start_pos=player_start_pos, save_path=save_path)
             else:
                 game_state = "TITLE" # 로드할 데이터가 없는 경우
 
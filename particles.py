@@ -0,0 +1,121 @@
+# particles.py
+# 파편, 블록 부스러기 같은 작은 물체를 객체 하나씩이 아니라 NumPy 열(위치, 속도, 크기, 수명 ...)로 저장합니다.
+# 중력, 타일 충돌, 마찰, 수명 감소를 전체 배열에 대해 한 번씩만 계산하므로 수천 개도 프레임 안에 처리됩니다.
+
+import random
+import numpy as np
+from config import TILE_SIZE, CHUNK_SIZE, PARTICLE_GRAVITY, PARTICLE_LIFESPAN, PARTICLE_BURST_COUNT
+
+MAX_SPEED = TILE_SIZE - 1 # 한 프레임에 한 칸 넘게 움직이면 타일을 뚫고 지나갈 수 있으므로 제한
+STOP_SPEED = 0.1 # 땅 위에서 이보다 느려지면 완전히 멈춤
+
+class ParticleSystem:
+    """
+    크기가 타일 한 칸 이하인 사각형 입자들의 모음.
+    수명(life)이 -1인 입자는 사라지지 않고 (죽음 애니메이션의 파편 등), 0 이상이면 매 프레임 1씩 줄다가 0이 되면 지워집니다.
+    """
+    def __init__(self, gravity=PARTICLE_GRAVITY):
+        self.gravity = gravity
+        self.pos = np.zeros((0, 2)) # 왼쪽 위 꼭짓점 (픽셀)
+        self.vel = np.zeros((0, 2))
+        self.size = np.zeros((0, 2)) # 너비, 높이
+        self.life = np.zeros(0, dtype=np.int32)
+        self.friction = np.zeros(0)
+        self.color = np.zeros((0, 3), dtype=np.uint8)
+        self.on_ground = np.zeros(0, dtype=bool)
+        self.rng = np.random.default_rng(random.getrandbits(64)) # 전역 random에서 시드를 받아 녹화 재생 때도 같은 입자가 나옴
+
+    def __len__(self):
+        return len(self.life)
+
+    def add(self, pos, vel, size, color, life=-1, friction=0.7):
+        """입자 여러 개를 한 번에 추가합니다. pos, vel, size는 (N, 2), 나머지는 값 하나 또는 길이 N."""
+        pos = np.asarray(pos, dtype=np.float64).reshape(-1, 2)
+        count = len(pos)
+        self.pos = np.concatenate([self.pos, pos])
+        self.vel = np.concatenate([self.vel, np.asarray(vel, dtype=np.float64).reshape(count, 2)])
+        self.size = np.concatenate([self.size, np.broadcast_to(np.asarray(size, dtype=np.float64), (count, 2))])
+        self.life = np.concatenate([self.life, np.broadcast_to(np.asarray(life, dtype=np.int32), (count,))])
+        self.friction = np.concatenate([self.friction, np.broadcast_to(np.asarray(friction, dtype=np.float64), (count,))])
+        self.color = np.concatenate([self.color, np.broadcast_to(np.asarray(color, dtype=np.uint8), (count, 3))])
+        self.on_ground = np.concatenate([self.on_ground, np.zeros(count, dtype=bool)])
+
+    def burst(self, x, y, color, count=PARTICLE_BURST_COUNT):
+        """(x, y) 에서 사방으로 튀는 부스러기를 count개 만듭니다 (블록이 부서질 때 등)."""
+        sizes = self.rng.integers(4, 8, size=count).astype(np.float64)
+        vel = np.column_stack([self.rng.uniform(-2, 2, count), self.rng.uniform(-3, -1, count)])
+        self.add(np.column_stack([np.full(count, x) - sizes / 2, np.full(count, y) - sizes / 2]), vel,
+                 np.column_stack([sizes, sizes]), color, PARTICLE_LIFESPAN)
+
+    def update(self, world):
+        if len(self) == 0:
+            return
+        pos, vel, size = self.pos, self.vel, self.size
+
+        # 1. 가로 이동 후, 앞쪽 모서리가 들어간 칸이 막혀 있으면 그 칸 앞에 붙임
+        np.clip(vel, -MAX_SPEED, MAX_SPEED, out=vel)
+        pos[:, 0] += vel[:, 0]
+        solid = _SolidGrid(world, pos, size)
+        moving_right, moving_left = vel[:, 0] > 0, vel[:, 0] < 0
+        lead_col = np.floor_divide(np.where(moving_right, _last_pixel(pos[:, 0] + size[:, 0]), pos[:, 0]), TILE_SIZE)
+        top_row, bottom_row = np.floor_divide(pos[:, 1], TILE_SIZE), np.floor_divide(_last_pixel(pos[:, 1] + size[:, 1]), TILE_SIZE)
+        hit = (moving_right | moving_left) & (solid(lead_col, top_row) | solid(lead_col, bottom_row))
+        pos[:, 0] = np.where(hit & moving_right, lead_col * TILE_SIZE - size[:, 0], pos[:, 0])
+        pos[:, 0] = np.where(hit & moving_left, (lead_col + 1) * TILE_SIZE, pos[:, 0])
+
+        # 2. 중력을 더해 세로 이동 후 같은 방식으로 바닥/천장 충돌 처리
+        vel[:, 1] = np.minimum(vel[:, 1] + self.gravity, MAX_SPEED)
+        pos[:, 1] += vel[:, 1]
+        falling, rising = vel[:, 1] > 0, vel[:, 1] < 0
+        lead_row = np.floor_divide(np.where(falling, _last_pixel(pos[:, 1] + size[:, 1]), pos[:, 1]), TILE_SIZE)
+        left_col, right_col = np.floor_divide(pos[:, 0], TILE_SIZE), np.floor_divide(_last_pixel(pos[:, 0] + size[:, 0]), TILE_SIZE)
+        hit = (falling | rising) & (solid(left_col, lead_row) | solid(right_col, lead_row))
+        pos[:, 1] = np.where(hit & falling, lead_row * TILE_SIZE - size[:, 1], pos[:, 1])
+        pos[:, 1] = np.where(hit & rising, (lead_row + 1) * TILE_SIZE, pos[:, 1])
+        vel[hit, 1] = 0
+        self.on_ground = hit & falling
+
+        # 3. 땅 위에 있는 입자만 마찰력 적용
+        vel[:, 0] = np.where(self.on_ground, vel[:, 0] * self.friction, vel[:, 0])
+        vel[self.on_ground & (np.abs(vel[:, 0]) < STOP_SPEED), 0] = 0
+
+        # 4. 수명 감소, 다 된 입자는 지움
+        self.life[self.life > 0] -= 1
+        alive = self.life != 0
+        if not alive.all():
+            for name in ("pos", "vel", "size", "life", "friction", "color", "on_ground"):
+                setattr(self, name, getattr(self, name)[alive])
+
+    def draw(self, screen, camera_x, camera_y):
+        if len(self) == 0:
+            return
+        screen_x, screen_y = self.pos[:, 0] - camera_x, self.pos[:, 1] - camera_y
+        visible = ((screen_x + self.size[:, 0] > 0) & (screen_x < screen.get_width()) &
+                   (screen_y + self.size[:, 1] > 0) & (screen_y < screen.get_height()))
+        rects = np.column_stack([screen_x, screen_y, self.size])[visible].astype(np.int64).tolist()
+        for color, rect in zip(self.color[visible].tolist(), rects):
+            screen.fill(color, rect)
+
+def _last_pixel(edge):
+    """오른쪽/아래 모서리 좌표(끝은 포함하지 않음)에서 입자가 실제로 걸쳐 있는 마지막 픽셀."""
+    return np.ceil(edge) - 1
+
+class _SolidGrid:
+    """입자들이 있는 범위의 타일을 한 번에 복사해 두고, 그리드 좌표 배열로 막힘 여부를 조회합니다."""
+    def __init__(self, world, pos, size):
+        loaded = world.chunks.keys()
+        self.x0 = int(np.floor_divide(pos[:, 0].min(), TILE_SIZE)) - 1
+        x1 = int(np.floor_divide((pos[:, 0] + size[:, 0]).max(), TILE_SIZE)) + 2
+        if loaded: # 로드된 청크 밖은 어차피 빈 칸이므로 그 범위까지만 복사
+            self.x0 = max(self.x0, min(loaded) * CHUNK_SIZE)
+            x1 = min(x1, (max(loaded) + 1) * CHUNK_SIZE)
+        self.grid = world.region(self.x0, 0, max(self.x0, x1), world.height) != 0
+
+    def __call__(self, cols, rows):
+        cols = cols.astype(np.int64) - self.x0
+        rows = rows.astype(np.int64)
+        height, width = self.grid.shape
+        inside = (cols >= 0) & (cols < width) & (rows >= 0) & (rows < height)
+        if width == 0:
+            return inside
+        return inside & self.grid[np.clip(rows, 0, height - 1), np.clip(cols, 0, width - 1)]
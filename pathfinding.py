@@ -0,0 +1,109 @@
+# pathfinding.py
+# 플레이어를 목표로 하는 흐름장(다익스트라 맵) 길찾기.
+# 플레이어 주변의 "설 수 있는 칸"을 노드로, 걷기/점프/떨어지기를 간선으로 보고
+# 플레이어 칸에서 거꾸로 한 번만 탐색해서 모든 칸의 "다음에 갈 칸"을 구해 둡니다.
+# 모든 적이 이 결과를 같이 쓰므로 적이 많아져도 길찾기 비용은 그대로입니다.
+
+import heapq
+import numpy as np
+from config import TILE_SIZE
+
+FLOW_RADIUS = 24 # 플레이어 좌우/위아래로 이 칸 수만큼만 탐색
+BODY_CELLS = 2 # 적의 키 (칸). 설 수 있는 칸은 위로 이만큼 비어 있어야 함
+JUMP_CELLS = 3 # 점프로 올라갈 수 있는 높이 (jump_power -13, 중력 0.6 → 약 140픽셀)
+JUMP_COST = 1 # 점프는 걷기보다 비싸게 (높이 1칸마다 추가 비용)
+
+class FlowField:
+    def __init__(self, world, radius=FLOW_RADIUS):
+        self.world = world
+        self.radius = radius
+        self.target = None
+        self.solid_version = None
+        self.next_cells = {} # {설 수 있는 칸: 플레이어 쪽으로 가는 다음 칸}
+
+    def update(self, player_rect):
+        """플레이어가 다른 칸으로 움직였거나 칸이 막히거나 뚫렸을 때만 흐름장을 다시 계산합니다."""
+        target = self._stand_cell_below(player_rect.centerx // TILE_SIZE, (player_rect.bottom - 1) // TILE_SIZE)
+        if target is None: # 공중에 떠 있으면 마지막으로 서 있던 칸 기준 흐름장을 그대로 씀
+            return
+        if target == self.target and self.world.solid_version == self.solid_version:
+            return
+        self.target, self.solid_version = target, self.world.solid_version
+        self._compute()
+
+    def next_step(self, cell):
+        """cell에서 플레이어 쪽으로 가려면 다음에 가야 할 칸. 길이 없거나 이미 도착했으면 None."""
+        return self.next_cells.get(cell)
+
+    def _stand_cell_below(self, x, y):
+        """(x, y)에서 아래로 내려가며 처음 만나는 바닥 바로 위 칸. 가까이에 바닥이 없으면 None."""
+        for row in range(max(0, y), min(self.world.height - 1, y + JUMP_CELLS + 1)):
+            if self.world.is_solid(x, row + 1):
+                return (x, row)
+        return None
+
+    def _compute(self):
+        target_x, target_y = self.target
+        radius = self.radius
+        x0, y0 = target_x - radius, target_y - radius
+        # 위로 BODY_CELLS - 1 칸, 아래로 1칸 여유를 두고 점유 배열을 만듦
+        solid = self.world.region(x0, y0 - BODY_CELLS, target_x + radius + 1, target_y + radius + 2) != 0
+        # 맵 아래는 설 수 없음 (맵 위쪽은 빈 공간으로 봄)
+        empty = ~solid
+        below_map = np.arange(y0 - BODY_CELLS, target_y + radius + 2) >= self.world.height
+        empty[below_map] = False
+
+        # stand[y, x]: 몸이 들어갈 공간이 있고 바로 아래가 블록인 칸 (y, x는 x0, y0 기준)
+        size = 2 * radius + 1
+        body_free = np.ones((size, size), dtype=bool)
+        for offset in range(BODY_CELLS):
+            body_free &= empty[BODY_CELLS - offset:BODY_CELLS - offset + size]
+        stand = body_free & solid[BODY_CELLS + 1:BODY_CELLS + 1 + size]
+
+        def is_stand(col, row):
+            return 0 <= col < size and 0 <= row < size and stand[row, col]
+
+        def is_body_free(col, row):
+            return 0 <= col < size and 0 <= row < size and body_free[row, col]
+
+        # 각 칸에서 갈 수 있는 칸 (정방향 간선)을 만든 뒤 거꾸로 뒤집음
+        incoming = {} # {도착 칸: [(출발 칸, 비용)]}
+        rows, cols = np.nonzero(stand)
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            for step in (-1, 1):
+                side = col + step
+                if is_stand(side, row): # 걷기
+                    incoming.setdefault((side, row), []).append(((col, row), 1))
+                elif is_body_free(side, row): # 떨어지기 (옆 칸으로 나가서 처음 닿는 바닥까지)
+                    for fall_row in range(row + 1, size):
+                        if not is_body_free(side, fall_row):
+                            break
+                        if is_stand(side, fall_row):
+                            incoming.setdefault((side, fall_row), []).append(((col, row), 1))
+                            break
+                # 점프 (머리 위가 비어 있는 만큼만)
+                for height in range(1, JUMP_CELLS + 1):
+                    if not is_body_free(col, row - height):
+                        break
+                    if is_stand(side, row - height):
+                        incoming.setdefault((side, row - height), []).append(((col, row), 1 + JUMP_COST * height))
+                        break
+
+        # 플레이어 칸에서 거꾸로 다익스트라
+        start = (radius, radius)
+        distances = {start: 0}
+        next_cells = {}
+        queue = [(0, start)]
+        while queue:
+            distance, cell = heapq.heappop(queue)
+            if distance > distances[cell]:
+                continue
+            for source, cost in incoming.get(cell, ()):
+                new_distance = distance + cost
+                if new_distance < distances.get(source, new_distance + 1):
+                    distances[source] = new_distance
+                    next_cells[source] = cell
+                    heapq.heappush(queue, (new_distance, source))
+
+        self.next_cells = {(col + x0, row + y0): (next_col + x0, next_row + y0)
+                           for (col, row), (next_col, next_row) in next_cells.items()}
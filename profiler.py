@@ -0,0 +1,87 @@
+# profiler.py
+# main_game 루프의 단계별 시간을 재는 프레임 프로파일러.
+# 각 단계가 끝날 때 mark(단계 이름)를 부르면 직전 mark 이후 걸린 시간이 그 단계에 더해집니다 (코드를 감쌀 필요 없음).
+# 최근 PROFILER_WINDOW 프레임의 평균/p99와 프레임 시간 그래프를 Shift 디버그 오버레이에 그리고,
+# GRIDSHIFT_PROFILE_CSV 환경 변수로 파일 경로를 주면 프레임마다 한 줄씩 CSV로 기록합니다.
+
+import csv
+import time
+from collections import deque
+import pygame
+from config import PROFILER_WINDOW, SIMULATION_STEP_MS, WHITE, YELLOW
+
+# 루프 안에서 실행되는 순서대로 (CSV 열 순서도 같음)
+PHASES = ("chunks", "events", "player", "items", "enemies", "breaking", "grass", "tiles", "sprites", "previews", "ui")
+GRAPH_WIDTH, GRAPH_HEIGHT = 240, 60
+GRAPH_SCALE_MS = SIMULATION_STEP_MS * 2 # 그래프 맨 위 = 두 틱 분량의 시간
+
+class FrameProfiler:
+    def __init__(self, csv_path=None, window=PROFILER_WINDOW):
+        self.frames = deque(maxlen=window) # (전체 시간, {단계: ms}) 최근 프레임 기록 (window=None이면 모든 프레임)
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.frame_start = self.last_mark = time.perf_counter()
+        self.frame_index = 0
+        self.csv_file = self.csv_writer = None
+        if csv_path:
+            self.csv_file = open(csv_path, 'w', newline='', encoding='utf-8')
+            self.csv_writer = csv.writer(self.csv_file)
+            self.csv_writer.writerow(["frame", "steps", "total_ms"] + [f"{phase}_ms" for phase in PHASES])
+
+    def begin_frame(self):
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.frame_start = self.last_mark = time.perf_counter()
+
+    def mark(self, phase):
+        """직전 mark (또는 프레임 시작) 이후 걸린 시간을 phase에 더합니다. 한 프레임에 여러 번 불러도 됨 (틱이 여러 번 도는 경우)."""
+        now = time.perf_counter()
+        self.current[phase] += (now - self.last_mark) * 1000
+        self.last_mark = now
+
+    def end_frame(self, steps=1):
+        total = (time.perf_counter() - self.frame_start) * 1000
+        self.frames.append((total, self.current))
+        if self.csv_writer is not None:
+            self.csv_writer.writerow([self.frame_index, steps, f"{total:.3f}"] + [f"{self.current[phase]:.3f}" for phase in PHASES])
+        self.frame_index += 1
+
+    def close(self):
+        if self.csv_file is not None:
+            self.csv_file.close()
+            self.csv_file = self.csv_writer = None
+
+    def recent(self, count=None):
+        return list(self.frames)[-count:] if count else list(self.frames)
+
+    def stats(self, count=None):
+        """최근 count 프레임 (None이면 기록된 모든 프레임)의 {단계: (평균 ms, p99 ms)} 와 전체 프레임 시간 (평균, p99)."""
+        def summarize(values):
+            ordered = sorted(values)
+            return sum(ordered) / len(ordered), ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        frames = self.recent(count)
+        if not frames:
+            return {}, (0.0, 0.0)
+        phases = {phase: summarize([timings[phase] for _, timings in frames]) for phase in PHASES}
+        return phases, summarize([total for total, _ in frames])
+
+    def draw(self, screen, font, x, y):
+        """(x, y)부터 최근 PROFILER_WINDOW 프레임의 단계별 평균/p99 표와 프레임 시간 그래프를 그립니다."""
+        frames = self.recent(PROFILER_WINDOW)
+        phases, (total_avg, total_p99) = self.stats(PROFILER_WINDOW)
+        line_height = font.get_linesize()
+        rows = [f"frame {total_avg:5.2f} / {total_p99:5.2f} ms"] + [f"{phase:<9}{avg:5.2f} / {p99:5.2f}" for phase, (avg, p99) in phases.items()]
+        for i, text in enumerate(rows):
+            screen.blit(font.render(text, True, YELLOW if i == 0 else WHITE), (x, y + i * line_height))
+
+        # 프레임 시간 그래프 (가장 오른쪽이 최근 프레임, 노란 선은 한 틱 시간)
+        graph_top = y + len(rows) * line_height + 5
+        graph = pygame.Rect(x, graph_top, GRAPH_WIDTH, GRAPH_HEIGHT)
+        pygame.draw.rect(screen, (0, 0, 0), graph)
+        bar_width = GRAPH_WIDTH / PROFILER_WINDOW
+        for i, (total, _) in enumerate(frames):
+            height = min(GRAPH_HEIGHT, int(total / GRAPH_SCALE_MS * GRAPH_HEIGHT))
+            color = (255, 80, 80) if total > SIMULATION_STEP_MS else (80, 220, 80)
+            bar_x = graph.right - (len(frames) - i) * bar_width
+            pygame.draw.rect(screen, color, (bar_x, graph.bottom - height, max(1, bar_width), height))
+        budget_y = graph.bottom - int(GRAPH_HEIGHT / 2)
+        pygame.draw.line(screen, YELLOW, (graph.left, budget_y), (graph.right, budget_y), 1)
+        pygame.draw.rect(screen, WHITE, graph, 1)
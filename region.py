@@ -0,0 +1,138 @@
+# region.py
+# 청크 단위 바이너리 월드 저장 형식.
+#
+# [헤더][청크 오프셋 테이블][청크 블록 ...]
+# - 헤더: 매직, 버전, 월드 높이, 청크 크기, 시드, 플레이어 위치, 청크 개수, 테이블 위치
+# - 오프셋 테이블: 청크마다 (chunk_x, 블록 위치, 블록 길이)
+# - 청크 블록: 타일 타입 배열(height x chunk_size, uint8)을 zlib으로 압축한 바이트
+# 테이블만 읽으면 원하는 청크 블록 하나만 골라서 읽고 풀 수 있습니다.
+#
+# 저장할 때는 바뀐 청크 블록과 새 오프셋 테이블을 파일 끝에 덧붙이고 헤더의 테이블 위치만 고칩니다.
+# 더 이상 쓰이지 않는 블록이 너무 많아지면 파일 전체를 다시 씁니다.
+
+import os
+import struct
+import zlib
+import numpy as np
+
+MAGIC = b"GSWR"
+VERSION = 1
+FLAG_HAS_SEED = 1
+FLAG_HAS_PLAYER = 2
+COMPRESS_LEVEL = 6
+COMPACT_RATIO = 2 # 파일 크기가 살아있는 블록 크기의 2배를 넘으면 다시 씀
+
+HEADER = struct.Struct("<4sHHHHQiiIQ") # 매직, 버전, 높이, 청크 크기, 플래그, 시드, 플레이어 x, y, 청크 개수, 테이블 위치
+TABLE_ENTRY = struct.Struct("<iQI") # chunk_x, 블록 위치, 블록 길이
+
+def compress_chunk(types):
+    return zlib.compress(np.ascontiguousarray(types, dtype=np.uint8).tobytes(), COMPRESS_LEVEL)
+
+class RegionFile:
+    """저장된 리전 파일. 열 때는 헤더와 오프셋 테이블만 읽고, 청크 블록은 요청할 때 읽습니다."""
+    def __init__(self, path):
+        self.path = path
+        self.reload()
+
+    def reload(self):
+        path = self.path
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError(f"{path}: 헤더가 잘렸습니다")
+            magic, version, self.height, self.chunk_size, flags, seed, player_x, player_y, chunk_count, table_offset = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path}: 지원하지 않는 저장 파일입니다")
+            self.seed = seed if flags & FLAG_HAS_SEED else None
+            self.player_pos = (player_x, player_y) if flags & FLAG_HAS_PLAYER else None
+
+            f.seek(table_offset)
+            table = f.read(TABLE_ENTRY.size * chunk_count)
+            if len(table) < TABLE_ENTRY.size * chunk_count:
+                raise ValueError(f"{path}: 오프셋 테이블이 잘렸습니다")
+            self.file_size = f.seek(0, os.SEEK_END)
+        self.table = {chunk_x: (offset, length) for chunk_x, offset, length in TABLE_ENTRY.iter_unpack(table)}
+
+    def __contains__(self, chunk_x):
+        return chunk_x in self.table
+
+    def chunk_xs(self):
+        return self.table.keys()
+
+    def read_raw(self, chunk_x):
+        """청크 블록을 압축된 상태 그대로 읽습니다."""
+        offset, length = self.table[chunk_x]
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def read_chunk(self, chunk_x):
+        """청크 하나를 (height, chunk_size) uint8 배열로 읽습니다. 저장되지 않은 청크면 None."""
+        if chunk_x not in self.table:
+            return None
+        return decompress_chunk(self.read_raw(chunk_x), self.height, self.chunk_size)
+
+    def append_chunks(self, blocks, player_pos=None):
+        """
+        {chunk_x: 압축된 청크 블록} 만 파일 끝에 덧붙여 저장합니다 (바뀌지 않은 청크는 건드리지 않음).
+        헤더는 마지막에 고치므로 중간에 실패해도 이전 내용은 그대로 남습니다.
+        """
+        if player_pos is None:
+            player_pos = self.player_pos
+        table = dict(self.table)
+        live_size = sum(length for chunk_x, (offset, length) in table.items() if chunk_x not in blocks) + sum(map(len, blocks.values()))
+        if self.file_size > COMPACT_RATIO * (live_size + HEADER.size + TABLE_ENTRY.size * len(table)):
+            # 버려진 블록이 많으면 전체를 다시 씀
+            all_blocks = {chunk_x: self.read_raw(chunk_x) for chunk_x in table if chunk_x not in blocks}
+            all_blocks.update(blocks)
+            write_region(self.path, all_blocks, self.height, self.chunk_size, self.seed, player_pos)
+            self.reload()
+            return
+
+        with open(self.path, 'r+b') as f:
+            offset = f.seek(0, os.SEEK_END)
+            for chunk_x, block in blocks.items():
+                f.write(block)
+                table[chunk_x] = (offset, len(block))
+                offset += len(block)
+            table_offset = offset
+            f.write(b"".join(TABLE_ENTRY.pack(chunk_x, *table[chunk_x]) for chunk_x in sorted(table)))
+            f.flush()
+            f.seek(0)
+            f.write(_pack_header(self.height, self.chunk_size, self.seed, player_pos, len(table), table_offset))
+        self.reload()
+
+def decompress_chunk(block, height, chunk_size):
+    return np.frombuffer(zlib.decompress(block), dtype=np.uint8).reshape(height, chunk_size).copy()
+
+def _pack_header(height, chunk_size, seed, player_pos, chunk_count, table_offset):
+    flags = (FLAG_HAS_SEED if seed is not None else 0) | (FLAG_HAS_PLAYER if player_pos is not None else 0)
+    player_x, player_y = player_pos if player_pos is not None else (0, 0)
+    return HEADER.pack(MAGIC, VERSION, height, chunk_size, flags, seed or 0, int(player_x), int(player_y), chunk_count, table_offset)
+
+def write_region(path, blocks, height, chunk_size, seed=None, player_pos=None):
+    """
+    {chunk_x: 압축된 청크 블록} 을 리전 파일로 씁니다.
+    임시 파일에 먼저 쓴 뒤 교체하므로, 같은 파일에서 블록을 읽어 오는 중이어도 안전합니다.
+    """
+    chunk_xs = sorted(blocks)
+
+    table_offset = HEADER.size
+    offset = table_offset + TABLE_ENTRY.size * len(chunk_xs)
+    table = bytearray()
+    for chunk_x in chunk_xs:
+        table += TABLE_ENTRY.pack(chunk_x, offset, len(blocks[chunk_x]))
+        offset += len(blocks[chunk_x])
+
+    header = _pack_header(height, chunk_size, seed, player_pos, len(chunk_xs), table_offset) # 값이 범위를 벗어나면 파일을 만들기 전에 실패
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(header)
+            f.write(table)
+            for chunk_x in chunk_xs:
+                f.write(blocks[chunk_x])
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path): # 쓰다가 실패하면 임시 파일을 남기지 않음
+            os.remove(temp_path)
@@ -0,0 +1,98 @@
+# replay.py
+# 녹화한 플레이를 그대로 다시 돌려서 프레임 시간 통계를 내는 재생기 (특정 플레이에서만 느려지는 문제를 반복해서 재기 위함).
+# 녹화 파일에는 프레임마다의 입력과 프레임 시간, 시작할 때의 난수 시드가 들어 있어서 매번 같은 게임이 진행됩니다.
+#
+# 녹화: GRIDSHIFT_RECORD=session.rec python main.py   (게임을 끝내거나 죽으면 파일이 써짐)
+# 재생: python replay.py session.rec --headless --out after.json --compare before.json
+#       python replay.py session.rec --csv frames.csv   (창을 띄워서 재생, 프레임별 단계 시간을 CSV로)
+#
+# 저장된 월드에서 녹화했다면 녹화 파일에 들어 있는 시작 당시의 저장 파일로 재생합니다 (--save 로 다른 파일을 줄 수 있음).
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="녹화한 플레이를 재생하고 프레임 시간 통계를 냅니다.")
+    parser.add_argument("recording", help="GRIDSHIFT_RECORD로 녹화한 파일")
+    parser.add_argument("--headless", action="store_true", help="창 없이 기다리지 않고 최대한 빨리 재생")
+    parser.add_argument("--save", help="녹화에 들어 있는 저장 파일 대신 쓸 저장 파일")
+    parser.add_argument("--csv", help="프레임별 단계 시간을 쓸 CSV 파일")
+    parser.add_argument("--out", help="통계를 쓸 JSON 파일")
+    parser.add_argument("--compare", help="비교할 이전 통계 JSON 파일")
+    return parser.parse_args()
+
+def summarize(profiler):
+    """재생한 모든 프레임의 전체 시간과 단계별 시간 통계."""
+    totals = sorted(total for total, _ in profiler.frames)
+    if not totals:
+        return {"frames": 0}
+    def percentile(p):
+        return round(totals[min(len(totals) - 1, int(len(totals) * p))], 3)
+    phases, (total_avg, _) = profiler.stats()
+    return {
+        "frames": len(totals),
+        "frame_ms": {"avg": round(total_avg, 3), "p50": percentile(0.5), "p99": percentile(0.99), "max": round(totals[-1], 3)},
+        "phases_ms": {phase: {"avg": round(avg, 3), "p99": round(p99, 3)} for phase, (avg, p99) in phases.items()},
+    }
+
+def print_summary(summary, baseline=None):
+    before = (baseline or {}).get("frame_ms", {})
+    print(f"{summary['frames']} 프레임", file=sys.stderr)
+    for key, value in summary.get("frame_ms", {}).items():
+        change = f"  (이전 {before[key]:.2f}ms, {value / before[key]:.2f}x)" if before.get(key) else ""
+        print(f"  frame {key:<4}{value:>9.2f}ms{change}", file=sys.stderr)
+    before_phases = (baseline or {}).get("phases_ms", {})
+    for phase, values in summary.get("phases_ms", {}).items():
+        previous = before_phases.get(phase, {}).get("avg")
+        change = f"  (이전 {previous:.2f}ms)" if previous is not None else ""
+        print(f"  {phase:<10}{values['avg']:>7.2f} / {values['p99']:>7.2f}ms{change}", file=sys.stderr)
+
+def main():
+    args = parse_args()
+    if args.headless:
+        os.environ["GRIDSHIFT_HEADLESS"] = "1" # config를 import하기 전에 설정해야 하므로 게임 모듈은 여기서 import
+    from world import World, load_map
+    from controls import ReplayInput, load_recording, write_recorded_save
+    from profiler import FrameProfiler
+    from game import main_game
+
+    recording = load_recording(args.recording)
+    # 저장 파일은 청크를 필요할 때 읽으므로 재생이 끝날 때까지 임시 폴더를 유지 (게임 저장 폴더는 건드리지 않음)
+    with tempfile.TemporaryDirectory(prefix="gridshift-replay-") as folder:
+        save_path = args.save or write_recorded_save(recording, folder)
+        if save_path:
+            save_data = load_map(save_path)
+            if save_data is None:
+                sys.exit(f"녹화한 월드의 저장 파일을 읽을 수 없습니다: {save_path}")
+            world = World.from_save_data(save_data)
+        else:
+            world = World.from_save_data({"seed": recording["world_seed"]})
+
+        profiler = FrameProfiler(args.csv, window=None) # 통계는 재생한 모든 프레임으로 냄
+        started = time.perf_counter()
+        result = main_game(world, recording["world_name"], start_pos=recording["start_pos"],
+                           controls=ReplayInput(recording), profiler=profiler)
+        elapsed = time.perf_counter() - started
+
+    summary = dict(recording=os.path.basename(args.recording), headless=args.headless, result=result,
+                   wall_s=round(elapsed, 3), **summarize(profiler))
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print(f"{result}: {elapsed:.2f}초", file=sys.stderr)
+    print_summary(summary, baseline)
+
+    text = json.dumps(summary, indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# spatial_hash.py
+# 움직이는 엔티티(아이템 등)를 고정 크기 격자 칸에 나눠 담아 두는 색인.
+# 모든 엔티티끼리 비교하는 대신 주변 칸에 들어 있는 엔티티만 후보로 돌려줍니다.
+# 후보는 넣은 순서대로 돌려주므로, 리스트 전체를 순서대로 검사하던 것과 충돌 처리 순서가 같습니다.
+
+from itertools import count
+
+class SpatialHash:
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {} # {(칸 x, 칸 y): {엔티티: None}}
+        self.entity_cells = {} # {엔티티: 걸쳐 있는 칸 범위 (x0, y0, x1, y1)}
+        self.order = {} # {엔티티: 넣은 순번}
+        self._counter = count()
+
+    def _cell_range(self, rect):
+        size = self.cell_size
+        return rect.left // size, rect.top // size, (rect.right - 1) // size, (rect.bottom - 1) // size
+
+    def insert(self, entity):
+        """엔티티를 entity.rect가 걸친 모든 칸에 등록합니다."""
+        cell_range = self._cell_range(entity.rect)
+        self.entity_cells[entity] = cell_range
+        self.order.setdefault(entity, next(self._counter))
+        x0, y0, x1, y1 = cell_range
+        for cell_x in range(x0, x1 + 1):
+            for cell_y in range(y0, y1 + 1):
+                self.cells.setdefault((cell_x, cell_y), {})[entity] = None
+
+    def remove(self, entity):
+        cell_range = self.entity_cells.pop(entity, None)
+        if cell_range is None:
+            return
+        self.order.pop(entity)
+        x0, y0, x1, y1 = cell_range
+        for cell_x in range(x0, x1 + 1):
+            for cell_y in range(y0, y1 + 1):
+                cell = self.cells[(cell_x, cell_y)]
+                del cell[entity]
+                if not cell:
+                    del self.cells[(cell_x, cell_y)]
+
+    def update(self, entity):
+        """엔티티가 움직인 뒤 호출합니다. 걸친 칸이 바뀌었을 때만 다시 등록합니다."""
+        cell_range = self._cell_range(entity.rect)
+        if self.entity_cells.get(entity) != cell_range:
+            order = self.order[entity]
+            self.remove(entity)
+            self.order[entity] = order
+            self.insert(entity)
+
+    def query(self, rect):
+        """rect와 같은 칸에 있는 엔티티를 넣은 순서대로 반환합니다 (실제로 겹치는지는 호출하는 쪽에서 확인)."""
+        found = {}
+        x0, y0, x1, y1 = self._cell_range(rect)
+        for cell_x in range(x0, x1 + 1):
+            for cell_y in range(y0, y1 + 1):
+                cell = self.cells.get((cell_x, cell_y))
+                if cell:
+                    found.update(cell)
+        return sorted(found, key=self.order.__getitem__)
+
+    def clear(self):
+        self.cells.clear()
+        self.entity_cells.clear()
+        self.order.clear()
+
+    def __len__(self):
+        return len(self.entity_cells)
@@ -0,0 +1,114 @@
+# spawner.py
+# 청크 단위 적 스폰 및 개체 수 관리.
+# 로드된 청크에만 적을 두고 (청크당 최대 MAX_ENEMIES_PER_CHUNK 마리),
+# 로드되지 않은 청크에 있는 적 (언로드된 청크에 남았거나 로드 범위 밖으로 걸어 나간 적)은
+# 매 틱 작은 기록(위치, 방향)으로 얼려 두었다가 그 청크가 다시 로드될 때 되살리고, 월드 아래로 떨어진 적은 없앱니다.
+# 그래서 시뮬레이션 비용은 전체 적 수가 아니라 로드된 범위에만 비례합니다.
+
+import random
+import numpy as np
+from config import TILE_SIZE, CHUNK_SIZE, MAX_ENEMIES_PER_CHUNK, ENEMY_SPAWN_INTERVAL, ENEMY_SPAWN_MIN_DISTANCE
+from entities import Enemy
+
+ENEMY_WIDTH, ENEMY_HEIGHT = int(35 * 0.75), int(70 * 0.75)
+
+class EnemySpawner:
+    def __init__(self, world):
+        self.world = world
+        self.known_chunks = set() # 지난 틱에 로드되어 있던 청크
+        self.frozen = {} # {chunk_x: [(x, y, 방향), ...]} 언로드된 청크에 있던 적
+        self.spawn_timer = 0
+
+    def update(self, enemies, player):
+        """청크 로드/언로드에 맞춰 적을 얼리거나 되살리고, 주기적으로 새 적을 스폰합니다. enemies 리스트를 직접 고칩니다."""
+        loaded = set(self.world.chunks)
+
+        # 1. 로드되지 않은 청크에 있는 적은 기록으로 얼려서 목록에서 빼고, 월드 아래로 떨어진 적은 없앰
+        for chunk_x in self.known_chunks - loaded:
+            self.frozen.setdefault(chunk_x, []) # 적이 없던 청크도 기록해 두어야 다시 로드될 때 새로 채우지 않음
+        remaining = []
+        for enemy in enemies:
+            chunk_x = enemy.rect.centerx // (CHUNK_SIZE * TILE_SIZE)
+            if enemy.rect.top >= self.world.height * TILE_SIZE:
+                continue
+            if chunk_x in loaded:
+                remaining.append(enemy)
+                continue
+            frozen = self.frozen.setdefault(chunk_x, [])
+            if len(frozen) < MAX_ENEMIES_PER_CHUNK:
+                frozen.append((enemy.rect.x, enemy.rect.y, enemy.direction))
+        enemies[:] = remaining
+
+        # 2. 새로 로드된 청크의 적을 되살림 (처음 로드된 청크라면 새로 채움)
+        for chunk_x in sorted(loaded - self.known_chunks):
+            if chunk_x in self.frozen:
+                room = MAX_ENEMIES_PER_CHUNK - self._counts(enemies).get(chunk_x, 0)
+                for x, y, direction in self.frozen.pop(chunk_x)[:max(0, room)]:
+                    self._restore(x, y, direction, enemies)
+            else:
+                self._populate(chunk_x, enemies, player)
+        self.known_chunks = loaded
+
+        # 3. 다른 청크에서 걸어 들어와 한도를 넘은 청크는 플레이어에게서 먼 적부터 없앰
+        counts = self._counts(enemies)
+        if any(count > MAX_ENEMIES_PER_CHUNK for count in counts.values()):
+            kept = {}
+            by_distance = sorted(enemies, key=lambda enemy: abs(enemy.rect.centerx - player.rect.centerx))
+            keep = set()
+            for enemy in by_distance:
+                chunk_x = enemy.rect.centerx // (CHUNK_SIZE * TILE_SIZE)
+                if kept.get(chunk_x, 0) < MAX_ENEMIES_PER_CHUNK:
+                    kept[chunk_x] = kept.get(chunk_x, 0) + 1
+                    keep.add(id(enemy))
+            enemies[:] = [enemy for enemy in enemies if id(enemy) in keep]
+
+        # 4. 일정 시간마다 적이 부족한 청크 하나에 한 마리를 더 스폰
+        self.spawn_timer += 1
+        if self.spawn_timer >= ENEMY_SPAWN_INTERVAL:
+            self.spawn_timer = 0
+            counts = self._counts(enemies)
+            candidates = [chunk_x for chunk_x in sorted(loaded) if counts.get(chunk_x, 0) < MAX_ENEMIES_PER_CHUNK]
+            if candidates:
+                self._spawn_in(random.choice(candidates), enemies, player)
+
+    def _counts(self, enemies):
+        counts = {}
+        for enemy in enemies:
+            chunk_x = enemy.rect.centerx // (CHUNK_SIZE * TILE_SIZE)
+            counts[chunk_x] = counts.get(chunk_x, 0) + 1
+        return counts
+
+    def _restore(self, x, y, direction, enemies):
+        enemy = Enemy(x, y, ENEMY_WIDTH, ENEMY_HEIGHT) # 추적/공격 상태는 되살릴 때 순찰로 초기화
+        enemy.direction = enemy.facing_direction = direction
+        # 로드 범위 밖으로 걸어 나가며 얼었던 적은 빈 칸으로 보이던 곳에 있었으므로, 지형에 묻혔으면 그 열의 지표면 위로 올림
+        left, top = enemy.rect.left // TILE_SIZE, enemy.rect.top // TILE_SIZE
+        right, bottom = (enemy.rect.right - 1) // TILE_SIZE + 1, (enemy.rect.bottom - 1) // TILE_SIZE + 1
+        if self.world.any_solid(left, top, right, bottom):
+            column_x = enemy.rect.centerx // TILE_SIZE
+            chunk = self.world.chunks[column_x // CHUNK_SIZE]
+            solid_rows = np.flatnonzero(chunk.types[:, column_x % CHUNK_SIZE])
+            if len(solid_rows) == 0 or solid_rows[0] < 2:
+                return
+            enemy.rect.midbottom = (column_x * TILE_SIZE + TILE_SIZE // 2, int(solid_rows[0]) * TILE_SIZE)
+        enemies.append(enemy)
+
+    def _populate(self, chunk_x, enemies, player):
+        for _ in range(random.randint(0, MAX_ENEMIES_PER_CHUNK)):
+            self._spawn_in(chunk_x, enemies, player)
+
+    def _spawn_in(self, chunk_x, enemies, player):
+        """청크 안의 무작위 열 지표면 위에 적을 하나 놓습니다. 플레이어와 너무 가깝거나 설 곳이 없으면 건너뜀."""
+        chunk = self.world.chunks.get(chunk_x)
+        if chunk is None:
+            return
+        local_x = random.randrange(CHUNK_SIZE)
+        x = chunk_x * CHUNK_SIZE + local_x
+        if abs(x - player.rect.centerx // TILE_SIZE) < ENEMY_SPAWN_MIN_DISTANCE:
+            return
+        solid_rows = np.flatnonzero(chunk.types[:, local_x])
+        if len(solid_rows) == 0 or solid_rows[0] < 2: # 머리 위로 두 칸이 비어 있어야 함
+            return
+        enemy = Enemy(0, 0, ENEMY_WIDTH, ENEMY_HEIGHT)
+        enemy.rect.midbottom = (x * TILE_SIZE + TILE_SIZE // 2, int(solid_rows[0]) * TILE_SIZE)
+        enemies.append(enemy)
@@ -0,0 +1,128 @@
+# terrain.py
+# NumPy 기반 그라디언트(펄린) 노이즈 엔진과 지형 생성 함수 모음.
+# 셀 하나씩 파이썬 루프를 도는 대신 좌표 배열 전체를 한 번에 계산합니다.
+# 워커 프로세스에서도 쓸 수 있도록 config(pygame 초기화)는 import하지 않습니다.
+
+import numpy as np
+
+AIR, DIRT, GRASS, STONE = 0, 1, 2, 3
+SEED_MASK = 0xFFFFFFFFFFFFFFFF # 시드는 64비트 부호 없는 정수로 저장 (리전 파일 헤더 크기)
+
+SURFACE_NOISE_OCTAVES = 2
+SURFACE_NOISE_SCALE = 0.5  # 노이즈 진폭 보정 (기존 PerlinNoise와 비슷한 높낮이)
+STONE_DEPTH_RANGE = (8, 12)  # 지표면에서 돌 층까지의 깊이 (양 끝 포함)
+CAVE_MIN_DEPTH = 5  # 지표면에서 최소 5칸 아래부터 동굴 생성
+CAVE_THRESHOLD = 0.37  # 기존 PerlinNoise(|n| > 0.45)와 비슷한 동굴 비율(약 1.5%)이 되도록 조정
+
+# 펄린 노이즈에서 사용하는 8방향 그라디언트
+_GRADIENTS = np.array([(1, 1), (-1, 1), (1, -1), (-1, -1),
+                       (1, 0), (-1, 0), (0, 1), (0, -1)], dtype=np.float64)
+
+# 격자점 해시용 64비트 상수 (splitmix64 / murmur3 finalizer)
+_HASH_X, _HASH_Y = np.uint64(0x9E3779B97F4A7C15), np.uint64(0xC2B2AE3D27D4EB4F)
+_MIX_1, _MIX_2 = np.uint64(0xFF51AFD7ED558CCD), np.uint64(0xC4CEB9FE1A85EC53)
+_SHIFT = np.uint64(33)
+
+def normalize_seed(seed):
+    """아무 정수 시드를 저장할 수 있는 64비트 범위로 줄입니다 (지형 생성은 어차피 하위 비트만 씀). None은 그대로."""
+    return None if seed is None else int(seed) & SEED_MASK
+
+def noise_key(seed):
+    """시드로부터 격자점 해시에 섞을 64비트 키를 만듭니다."""
+    return np.uint64(np.random.SeedSequence(seed & SEED_MASK).generate_state(1, dtype=np.uint64)[0])
+
+def _lattice_hash(ix, iy, key):
+    """
+    정수 격자 좌표 전체와 키를 섞은 64비트 해시.
+    256칸 순열 테이블처럼 좌표를 감싸지(& 255) 않으므로 지형이 일정 간격으로 반복되지 않습니다.
+    """
+    h = (ix.astype(np.uint64) * _HASH_X) ^ (iy.astype(np.uint64) * _HASH_Y) ^ key
+    h ^= h >> _SHIFT
+    h *= _MIX_1
+    h ^= h >> _SHIFT
+    h *= _MIX_2
+    h ^= h >> _SHIFT
+    return h
+
+def _fade(t):
+    return t * t * t * (t * (t * 6 - 15) + 10)
+
+def perlin_2d(xs, ys, key):
+    """좌표 배열 xs, ys(같은 모양)에 대한 2D 펄린 노이즈 값을 한 번에 계산합니다. key는 noise_key(seed)."""
+    x0 = np.floor(xs)
+    y0 = np.floor(ys)
+    xf, yf = xs - x0, ys - y0
+    xi = x0.astype(np.int64)
+    yi = y0.astype(np.int64)
+
+    u, v = _fade(xf), _fade(yf)
+
+    def corner(ix, iy, dx, dy):
+        g = _GRADIENTS[(_lattice_hash(ix, iy, key) & np.uint64(7)).astype(np.intp)]
+        return g[..., 0] * dx + g[..., 1] * dy
+
+    n00 = corner(xi, yi, xf, yf)
+    n10 = corner(xi + 1, yi, xf - 1, yf)
+    n01 = corner(xi, yi + 1, xf, yf - 1)
+    n11 = corner(xi + 1, yi + 1, xf - 1, yf - 1)
+
+    nx0 = n00 + u * (n10 - n00)
+    nx1 = n01 + u * (n11 - n01)
+    return nx0 + v * (nx1 - nx0)
+
+def fractal_noise_2d(xs, ys, key, octaves):
+    """옥타브를 겹친 노이즈. 결과는 대략 -1 ~ 1 범위입니다."""
+    total = np.zeros(np.broadcast(xs, ys).shape, dtype=np.float64)
+    amplitude, frequency, amplitude_sum = 1.0, 1.0, 0.0
+    for _ in range(max(1, octaves)):
+        total += perlin_2d(xs * frequency, ys * frequency, key) * amplitude
+        amplitude_sum += amplitude
+        amplitude *= 0.5
+        frequency *= 2.0
+    return total / amplitude_sum
+
+def surface_heights(start_x, width, height, seed, frequency=0.05):
+    """start_x부터 width개 열의 지표면 높이(y)를 계산합니다."""
+    xs = np.arange(start_x, start_x + width, dtype=np.float64) * frequency * 2
+    noise = fractal_noise_2d(xs, np.full_like(xs, 0.5), noise_key(seed), SURFACE_NOISE_OCTAVES)
+    terrain = (height / 2 + noise * SURFACE_NOISE_SCALE * (height / 4)).astype(np.intp)
+    return np.clip(terrain, 5, height - 5)  # 최소/최대 높이 보장
+
+def generate_terrain(start_x, width, height, seed, frequency=0.05, octaves=4, stone_depths=None):
+    """
+    [start_x, start_x + width) 열 범위의 지형을 (height, width) uint8 배열로 생성합니다.
+    stone_depths를 주지 않으면 시드로부터 열마다 돌 층 깊이를 뽑습니다.
+    """
+    terrain_heights = surface_heights(start_x, width, height, seed, frequency)
+    if stone_depths is None:
+        low, high = STONE_DEPTH_RANGE
+        stone_depths = np.random.default_rng(seed).integers(low, high + 1, size=width)
+
+    rows = np.arange(height)[:, None]
+    tiles = np.zeros((height, width), dtype=np.uint8)
+    tiles[rows >= terrain_heights] = DIRT
+    tiles[rows >= terrain_heights + stone_depths] = STONE
+
+    # 지하 동굴 (동굴 노이즈는 지표면 아래 영역만 의미가 있음)
+    cave_frequency = frequency * 2
+    xs = np.arange(start_x, start_x + width, dtype=np.float64) * cave_frequency
+    ys = np.arange(height, dtype=np.float64)[:, None] * cave_frequency
+    cave_noise = fractal_noise_2d(xs[None, :], ys, noise_key(seed + 1), octaves)
+    is_cave = (np.abs(cave_noise) > CAVE_THRESHOLD) & (rows > terrain_heights + CAVE_MIN_DEPTH)
+    tiles[is_cave] = AIR
+
+    return tiles
+
+def chunk_seed(seed, chunk_x):
+    """월드 시드와 청크 좌표로부터 청크 전용 난수 시드를 만듭니다 (음수 좌표도 가능)."""
+    return np.random.SeedSequence([seed & 0xFFFFFFFF, chunk_x & 0xFFFFFFFF])
+
+def generate_chunk(chunk_x, chunk_size, height, seed, frequency=0.05, octaves=4):
+    """
+    chunk_x번째 청크(chunk_size 열)의 지형을 생성합니다.
+    노이즈는 월드 좌표로 계산하므로 이웃 청크와 자연스럽게 이어지고,
+    청크별 난수(돌 층 깊이)는 chunk_seed로 뽑기 때문에 어떤 순서로 생성해도 결과가 같습니다.
+    """
+    low, high = STONE_DEPTH_RANGE
+    stone_depths = np.random.default_rng(chunk_seed(seed, chunk_x)).integers(low, high + 1, size=chunk_size)
+    return generate_terrain(chunk_x * chunk_size, chunk_size, height, seed, frequency, octaves, stone_depths)
@@ -0,0 +1,6 @@
+# 테스트는 창과 오디오 장치 없이 실행 (config를 import하기 전에 설정해야 함)
+import os
+import sys
+
+os.environ["GRIDSHIFT_HEADLESS"] = "1"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,24 @@
+from config import TILE_SIZE
+from entities import Enemy, Player
+from spawner import ENEMY_WIDTH, ENEMY_HEIGHT
+from world import World
+
+def test_enemy_club_hits_without_drawing():
+    # 화면 없는 실행에서는 draw가 불리지 않으므로 몽둥이 판정은 update만으로 나와야 함
+    world = World.from_save_data({"seed": 7})
+    for chunk_x in (-1, 0, 1):
+        world.load_chunk(chunk_x)
+    col = next(x for x in range(1, 30) if world.surface_y(x) == world.surface_y(x + 1) == world.surface_y(x + 2))
+    ground = world.surface_y(col) * TILE_SIZE
+    player = Player(0, 0, 0, 0)
+    player.rect.midbottom = (col * TILE_SIZE + 90, ground)
+    enemy = Enemy(0, 0, ENEMY_WIDTH, ENEMY_HEIGHT)
+    enemy.rect.midbottom = (col * TILE_SIZE + 30, ground)
+    enemy.direction = enemy.facing_direction = 1
+
+    hits = 0
+    for _ in range(200):
+        enemy.update(player, world, can_see=True)
+        if enemy.club_world_rect and player.rect.colliderect(enemy.club_world_rect):
+            hits += 1
+    assert hits > 0
@@ -0,0 +1,75 @@
+import os
+import struct
+import threading
+import numpy as np
+import pygame
+import pytest
+from config import CHUNK_SIZE, WORLD_HEIGHT
+from region import RegionFile, compress_chunk, write_region
+from terrain import SEED_MASK
+from world import World, save_map, load_map
+
+BIG_SEED = 10 ** 19 # 월드 생성 화면은 숫자만 있으면 받으므로 int64를 넘는 시드가 들어올 수 있음
+
+def test_oversized_seed_is_reduced_and_saves(tmp_path):
+    world = World.from_save_data({"seed": BIG_SEED})
+    assert world.seed == BIG_SEED & SEED_MASK
+    world.load_chunk(0)
+    surface_y = world.surface_y(0)
+    world.set(0, surface_y, 0)
+
+    save_map(world, "big", pygame.Rect(0, 0, 40, 40), folder=str(tmp_path))
+
+    assert sorted(os.listdir(tmp_path)) == ["big.gsw"]
+    loaded = World.from_save_data(load_map(str(tmp_path / "big.gsw")))
+    assert loaded.seed == world.seed
+    assert loaded.region_file.read_chunk(0)[surface_y, 0] == 0
+
+def test_legacy_json_seed_is_reduced():
+    assert World.from_save_data({"seed": -1}).seed == SEED_MASK
+    assert World.from_save_data({"seed": BIG_SEED}).seed == BIG_SEED & SEED_MASK
+
+def test_failed_write_leaves_no_temp_file(tmp_path):
+    path = str(tmp_path / "broken.gsw")
+    blocks = {0: compress_chunk(np.zeros((WORLD_HEIGHT, CHUNK_SIZE), dtype=np.uint8))}
+    with pytest.raises(struct.error):
+        write_region(path, blocks, WORLD_HEIGHT, CHUNK_SIZE, seed=1, player_pos=(2 ** 40, 0))
+    assert os.listdir(tmp_path) == []
+
+def test_region_round_trip(tmp_path):
+    path = str(tmp_path / "world.gsw")
+    types = np.arange(WORLD_HEIGHT * CHUNK_SIZE, dtype=np.uint8).reshape(WORLD_HEIGHT, CHUNK_SIZE) % 4
+    write_region(path, {-3: compress_chunk(types)}, WORLD_HEIGHT, CHUNK_SIZE, seed=SEED_MASK, player_pos=(10, -20))
+    region = RegionFile(path)
+    assert (region.seed, region.player_pos) == (SEED_MASK, (10, -20))
+    assert np.array_equal(region.read_chunk(-3), types)
+
+def test_chunk_reads_during_save_see_consistent_data(tmp_path):
+    # 청크 로더 스레드가 읽는 동안 메인 스레드가 저장해도 (written_back 비우기, 리전 파일 교체) 항상 바뀐 내용이 보여야 함
+    world = World.from_save_data({"seed": 5})
+    chunk_xs = range(8)
+    for chunk_x in chunk_xs:
+        world.load_chunk(chunk_x)
+        world.set(chunk_x * CHUNK_SIZE, 0, 3)
+        world.unload_chunk(chunk_x)
+
+    errors, stop = [], threading.Event()
+    def read_loop():
+        try:
+            while not stop.is_set():
+                for chunk_x in chunk_xs:
+                    assert world.chunk_data(chunk_x)[0, 0] == 3
+        except Exception as e:
+            errors.append(e)
+    reader = threading.Thread(target=read_loop)
+    reader.start()
+    try:
+        for i in range(40):
+            world.load_chunk(i % 8)
+            world.set((i % 8) * CHUNK_SIZE + 1, 0, 3)
+            world.unload_chunk(i % 8)
+            save_map(world, "race", pygame.Rect(0, 0, 40, 40), folder=str(tmp_path))
+    finally:
+        stop.set()
+        reader.join()
+    assert errors == []
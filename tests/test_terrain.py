@@ -0,0 +1,19 @@
+import numpy as np
+from config import CHUNK_SIZE, WORLD_HEIGHT
+from terrain import STONE_DEPTH_RANGE, generate_terrain, surface_heights
+
+def test_terrain_does_not_repeat():
+    # 예전 256칸 순열 테이블은 2560열마다 똑같은 지형이 나왔음
+    # 지표면 높이와 동굴 배치가 어떤 청크 간격으로 밀어도 통째로 같아지지 않아야 함
+    seed, width = 42, 20000
+    heights = surface_heights(0, width, WORLD_HEIGHT, seed)
+    for shift in range(CHUNK_SIZE, width // 2, CHUNK_SIZE):
+        same = np.mean(heights[shift:] == heights[:-shift])
+        assert same < 0.5, f"지표면이 {shift}열마다 반복됨 ({same:.0%} 일치)"
+
+    # 돌 층 깊이는 청크마다 따로 뽑으므로 고정해 두고 지표면과 동굴만 비교
+    stone_depths = np.full(CHUNK_SIZE, STONE_DEPTH_RANGE[0])
+    first = generate_terrain(0, CHUNK_SIZE, WORLD_HEIGHT, seed, stone_depths=stone_depths)
+    for chunk_x in range(1, width // CHUNK_SIZE):
+        tiles = generate_terrain(chunk_x * CHUNK_SIZE, CHUNK_SIZE, WORLD_HEIGHT, seed, stone_depths=stone_depths)
+        assert not np.array_equal(first, tiles), f"청크 {chunk_x}가 청크 0과 같음"
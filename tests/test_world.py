@@ -0,0 +1,17 @@
+from terrain import DIRT, GRASS
+from world import World
+
+def test_solid_version_ignores_grass_changes():
+    world = World.from_save_data({"seed": 7})
+    world.load_chunk(0)
+    surface_y = world.surface_y(0)
+    version = world.solid_version
+
+    world.set(0, surface_y, DIRT)
+    world.set(0, surface_y, GRASS)
+    assert world.solid_version == version # 잔디↔흙은 시야, 길찾기와 상관없음
+
+    world.set(0, surface_y, 0)
+    assert world.solid_version == version + 1
+    world.set(0, surface_y, 0)
+    assert world.solid_version == version + 1
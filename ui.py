@@ -3,6 +3,7 @@ import sys
 import os
 import random
 from config import *
+from terrain import normalize_seed
 # from world import save_map  <-- 파일 상단에 있던 이 라인이 삭제된 것이 중요합니다!
 
 class Button:
@@ -102,7 +103,7 @@ def world_creation_screen():
             if create_btn.is_clicked(event) or back_btn.is_clicked(event):
                 if create_btn.is_hovered: # 생성하기 버튼이 눌렸다면
                     final_name = name_text if name_text else f"World-{random.randint(100, 999)}"
-                    final_seed = int(seed_text) if seed_text.isdigit() else random.randint(0, 1000)
+                    final_seed = normalize_seed(int(seed_text)) if seed_text.isdigit() else random.randint(0, 1000)
                     return final_name, final_seed
                 else: # 뒤로가기 버튼이 눌렸다면
                     return None
@@ -117,7 +118,7 @@ def world_creation_screen():
                 # 엔터 키를 눌러도 월드 생성
                 if event.key == pygame.K_RETURN:
                     final_name = name_text if name_text else f"World-{random.randint(100, 999)}"
-                    final_seed = int(seed_text) if seed_text.isdigit() else random.randint(0, 1000)
+                    final_seed = normalize_seed(int(seed_text)) if seed_text.isdigit() else random.randint(0, 1000)
                     return final_name, final_seed
                 
                 if event.key == pygame.K_TAB:
@@ -139,10 +140,10 @@ def world_creation_screen():
 def load_selection_screen():
     back_btn = Button(20, 20, BTN_SMALL_W, BTN_SMALL_H, STRINGS["back_button"], GRAY, BLACK)
     while True:
-        saved_files = sorted([f for f in os.listdir(SAVE_FOLDER) if f.endswith('.json')])
+        saved_files = sorted([f for f in os.listdir(SAVE_FOLDER) if f.endswith(('.json', SAVE_EXTENSION))])
         world_buttons = []
         for i, filename in enumerate(saved_files):
-            world_name = filename.replace(".json", "")
+            world_name = os.path.splitext(filename)[0]
             load_btn = Button(SCREEN_WIDTH/2-220, 150+i*75, 360, 60, world_name, GRAY, BLACK)
             del_btn = Button(load_btn.rect.right+10, 150+i*75, 70, 60, "X", (200,50,50), (255,0,0), font=input_font)
             world_buttons.append({'load': load_btn, 'delete': del_btn, 'file': os.path.join(SAVE_FOLDER, filename)})
@@ -164,7 +165,7 @@ def load_selection_screen():
         if action_taken: continue
         pygame.display.update(); clock.tick(FPS)
 
-def pause_screen(world_grid, world_name, player_rect):
+def pause_screen(world, world_name, player_rect):
     # ✨✨✨ KEY CHANGE IS HERE! ✨✨✨
     # 이 함수가 호출될 때만 world.py에서 save_map을 불러옵니다.
     from world import save_map
@@ -179,7 +180,7 @@ def pause_screen(world_grid, world_name, player_rect):
             if event.type == pygame.QUIT: pygame.quit(); sys.exit()
             if (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE) or resume_btn.is_clicked(event): return "RESUME"
             if save_quit_btn.is_clicked(event):
-                save_map(world_grid, world_name, player_rect)
+                save_map(world, world_name, player_rect)
                 return "QUIT_TO_TITLE"
         pygame.display.update(); clock.tick(FPS)
 
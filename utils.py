@@ -1,16 +1,16 @@
 # utils.py
 
+import numpy as np
 from config import TILE_SIZE
 
-def has_line_of_sight(start_pos, end_pos, world_grid):
+def has_line_of_sight(start_pos, end_pos, world):
     """
     브레즈네햄 선 알고리즘을 사용해 두 그리드 좌표 사이에 시야가 확보되는지 확인합니다.
     맵 경계를 벗어나는지 확인하는 로직이 추가되었습니다.
     """
-    # ✨ 맵의 가로, 세로 크기를 미리 구해둡니다.
-    height = len(world_grid)
+    # ✨ 맵의 세로 크기를 미리 구해둡니다. (가로 방향으로는 무한)
+    height = world.height
     if height == 0: return True # 맵이 비어있으면 항상 시야 확보
-    width = len(world_grid[0])
 
     x0, y0 = start_pos
     x1, y1 = end_pos
@@ -27,11 +27,11 @@ def has_line_of_sight(start_pos, end_pos, world_grid):
             break
 
         # ✨ 맵 경계를 벗어나는지 먼저 확인합니다.
-        if not (0 <= y0 < height and 0 <= x0 < width):
+        if not (0 <= y0 < height):
             return False # 시야선이 맵 밖으로 나가면 막힌 것으로 간주
 
         # 경계 안쪽에 있을 때만 타일 존재 여부를 확인합니다.
-        if (x0, y0) != start_pos and world_grid[y0][x0] is not None:
+        if (x0, y0) != start_pos and world.is_solid(x0, y0):
             return False
 
         e2 = 2 * err
@@ -42,4 +42,49 @@ def has_line_of_sight(start_pos, end_pos, world_grid):
             err += dx
             y0 += sy
             
-    return True
\ No newline at end of file
+    return True
+
+def lines_of_sight(starts, ends, world):
+    """
+    여러 시야선을 한 번에 검사합니다. starts, ends는 (N, 2) 그리드 좌표이고 결과는 길이 N의 bool 배열입니다.
+    has_line_of_sight와 같은 브레즈네햄 선을 따르지만, 시야선마다 한 칸씩 걷는 대신
+    k번째 칸의 좌표를 식으로 바로 계산해서 모든 시야선의 모든 칸을 배열 연산 한 번으로 검사합니다.
+    """
+    starts = np.asarray(starts, dtype=np.int64).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=np.int64).reshape(-1, 2)
+    count = len(starts)
+    height = world.height
+    if count == 0 or height == 0:
+        return np.ones(count, dtype=bool)
+
+    x0, y0 = starts[:, 0:1], starts[:, 1:2]
+    x1, y1 = ends[:, 0:1], ends[:, 1:2]
+    dx, dy = np.abs(x1 - x0), np.abs(y1 - y0)
+    sx, sy = np.where(x0 < x1, 1, -1), np.where(y0 < y1, 1, -1)
+
+    # 긴 축으로는 매 걸음 한 칸씩, 짧은 축으로는 floor((2*짧은 축*k + 긴 축) / (2*긴 축)) 칸 이동
+    major, minor = np.maximum(dx, dy), np.minimum(dx, dy)
+    k = np.arange(int(major.max()))
+    minor_steps = (2 * minor * k + major) // np.maximum(2 * major, 1)
+    x_major = dx >= dy
+    xs = x0 + sx * np.where(x_major, k, minor_steps)
+    ys = y0 + sy * np.where(x_major, minor_steps, k)
+    on_line = k < major # 끝점은 검사하지 않음
+
+    # 맵 경계 밖으로 나가면 막힌 것으로 간주
+    out_of_bounds = on_line & ((ys < 0) | (ys >= height))
+
+    # 시야선은 시작점과 끝점이 만드는 사각형을 벗어나지 않으므로 그 범위만 점유 배열로 복사 (시작 칸은 검사하지 않음)
+    grid_x0 = int(min(x0.min(), x1.min()))
+    grid_y0 = max(0, int(min(y0.min(), y1.min())))
+    grid_y1 = min(height, int(max(y0.max(), y1.max())) + 1)
+    grid = world.region(grid_x0, grid_y0, int(max(x0.max(), x1.max())) + 1, grid_y1) != 0
+    if grid.size:
+        # 끝점을 지난 칸(on_line이 아닌 칸)은 범위를 벗어날 수 있으므로 잘라서 읽음
+        rows = np.clip(ys - grid_y0, 0, grid.shape[0] - 1)
+        cols = np.clip(xs - grid_x0, 0, grid.shape[1] - 1)
+        blocked = on_line & (k >= 1) & ~out_of_bounds & grid[rows, cols]
+    else:
+        blocked = np.zeros_like(on_line)
+
+    return ~(out_of_bounds | blocked).any(axis=1)
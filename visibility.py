@@ -0,0 +1,52 @@
+# visibility.py
+# 플레이어(머리, 몸, 발) 칸에서 주변 칸들이 보이는지를 한 번에 계산해 둔 시야 맵.
+# 시야 맵은 has_line_of_sight와 같은 브레즈네햄 선으로 반경 안의 모든 칸을 한 번에 검사해서 만들고,
+# 플레이어가 다른 칸으로 움직였거나 칸이 막히거나 뚫린 경우에만 다시 계산합니다.
+# 그 뒤 "플레이어가 이 칸을 볼 수 있는가"는 배열 조회 한 번으로 끝납니다.
+
+import numpy as np
+from utils import has_line_of_sight, lines_of_sight
+
+VISIBILITY_RADIUS = 16 # 적 감지 거리와 화면 안의 마우스 위치를 충분히 덮는 반경 (칸)
+
+class VisibilityMap:
+    def __init__(self, world, origin, radius=VISIBILITY_RADIUS):
+        self.world, self.origin, self.radius = world, origin, radius
+        self.solid_version = world.solid_version
+        origin_x, origin_y = origin
+        ys, xs = np.mgrid[origin_y - radius:origin_y + radius + 1, origin_x - radius:origin_x + radius + 1]
+        ends = np.stack([xs.ravel(), ys.ravel()], axis=1)
+        starts = np.broadcast_to(np.asarray(origin), ends.shape)
+        self.visible = lines_of_sight(starts, ends, world).reshape(ys.shape) # [y, x] (origin이 가운데)
+
+    def can_see(self, cell):
+        """origin에서 cell까지 시야가 확보되는지. 반경 밖의 칸은 직접 계산합니다."""
+        col, row = cell[0] - self.origin[0] + self.radius, cell[1] - self.origin[1] + self.radius
+        if 0 <= row < self.visible.shape[0] and 0 <= col < self.visible.shape[1]:
+            return bool(self.visible[row, col])
+        return has_line_of_sight(self.origin, cell, self.world)
+
+class PlayerVisibility:
+    """시작 칸별 시야 맵 모음. 매 틱 new_tick()을 호출하면 지난 틱에 쓰이지 않은 맵은 버립니다."""
+    def __init__(self, world):
+        self.world = world
+        self.maps = {} # {시작 칸: VisibilityMap}
+        self.used = set()
+
+    def new_tick(self):
+        self.maps = {origin: vis_map for origin, vis_map in self.maps.items() if origin in self.used}
+        self.used = set()
+
+    def map_from(self, origin):
+        self.used.add(origin)
+        vis_map = self.maps.get(origin)
+        if vis_map is None or vis_map.solid_version != self.world.solid_version:
+            vis_map = self.maps[origin] = VisibilityMap(self.world, origin)
+        return vis_map
+
+    def can_see(self, origin, cell):
+        return self.map_from(origin).can_see(cell)
+
+    def any_can_see(self, origins, cell):
+        """origins 중 하나에서라도 cell이 보이는지 (플레이어의 머리, 몸, 발 중 하나라도)."""
+        return any(self.map_from(origin).can_see(cell) for origin in origins)
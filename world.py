@@ -1,88 +1,263 @@
 import json
 import os
-import random
-from perlin_noise import PerlinNoise
-from entities import Tile
-from config import TILE_SIZE, SAVE_FOLDER
-
-def get_nearby_tiles(entity_rect, world_grid):
-    nearby_tiles = []
-    start_x = max(0, entity_rect.left // TILE_SIZE - 2)
-    end_x = min(len(world_grid[0]), entity_rect.right // TILE_SIZE + 3)
-    start_y = max(0, entity_rect.top // TILE_SIZE - 2)
-    end_y = min(len(world_grid), entity_rect.bottom // TILE_SIZE + 3)
-
-    for y in range(start_y, end_y):
-        for x in range(start_x, end_x):
-            if world_grid[y][x]:
-                nearby_tiles.append(world_grid[y][x])
-
-    return nearby_tiles
-
-def generate_map_data(width, height, seed, frequency, octaves):
-    # 1단계: 펄린 노이즈로 기본 지형 생성
-    map_data = [[0 for _ in range(width)] for _ in range(height)]
-    surface_noise = PerlinNoise(octaves=2, seed=seed)
-    
-    for x in range(width):
-        noise_val = surface_noise(x * 0.05)
-        # terrain_height 계산을 안정적인 값으로 조정
-        terrain_height = int(height / 2 + noise_val * (height / 4))
-        terrain_height = max(5, min(height - 5, terrain_height)) # 최소/최대 높이 보장
-        stone_layer_start_y = terrain_height + random.randint(8, 12)
-
-        for y in range(terrain_height, height):
-            # 설정된 깊이보다 깊으면 돌(type=3), 아니면 흙(type=1)으로 채움
-            if y >= stone_layer_start_y:
-                map_data[y][x] = 3 # 3번 타입은 돌
-            else:
-                map_data[y][x] = 1 # 1번 타입은 흙
-            
-    # 2단계: 지하 동굴 생성 (펄린 노이즈 방식)
-    cave_noise = PerlinNoise(octaves=octaves, seed=seed + 1)
-    cave_frequency = frequency * 2
-    # 동굴이 너무 넓게 생성되지 않도록 threshold 조정
-    cave_threshold = 0.45 
-
-    for y in range(height):
-        for x in range(width):
-            # 지표면에서 최소 5칸 아래부터 동굴 생성
-            if y > terrain_height + 5:
-                noise_val = cave_noise([x * cave_frequency, y * cave_frequency])
-                if abs(noise_val) > cave_threshold:
-                    map_data[y][x] = 0 # 동굴 파기
-
-    return map_data
-
-def create_world_grid(map_data):
-    world_grid = []
-    for y, row in enumerate(map_data):
-        grid_row = []
-        for x, tile_type in enumerate(row):
-            if tile_type != 0:
-                is_exposed = (y == 0 or map_data[y-1][x] == 0)
-                block_type = 2 if is_exposed else 1
-                grid_row.append(Tile(x, y, block_type))
-
-            else:
-                grid_row.append(None)
-        world_grid.append(grid_row)
-
-    return world_grid
-
-def grid_to_map_data(world_grid):
-    return [[tile.type if tile else 0 for tile in row] for row in world_grid]
-
-def save_map(world_grid, world_name, player_rect):
-    map_data = grid_to_map_data(world_grid)
-    save_data = {"map_data": map_data, "player_pos": (player_rect.x, player_rect.y)}
-    filename = os.path.join(SAVE_FOLDER, f"{world_name}.json")
-
-    with open(filename, 'w') as f: json.dump(save_data, f)
+import struct
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
+from config import TILE_SIZE, SAVE_FOLDER, SAVE_EXTENSION, CHUNK_SIZE, WORLD_HEIGHT
+from terrain import generate_chunk, normalize_seed
+from region import RegionFile, compress_chunk, decompress_chunk, write_region
+
+SUPPORT_OFFSETS = [(0, 1), (0, -1), (1, 0), (-1, 0)] # 아래, 위, 오른쪽, 왼쪽
+
+def generate_map_data(width, height, seed, frequency, octaves, workers=None):
+    # 맵을 CHUNK_SIZE 열 단위 작업으로 나눠 프로세스 풀에서 생성한 뒤 하나의 배열로 이어 붙임
+    # (청크마다 고정된 시드를 쓰므로 워커 수와 상관없이 결과가 같음)
+    chunk_count = -(-width // CHUNK_SIZE)
+    map_data = np.empty((height, chunk_count * CHUNK_SIZE), dtype=np.uint8)
+    chunk_xs = range(chunk_count)
+    args = (repeat(CHUNK_SIZE), repeat(height), repeat(seed), repeat(frequency), repeat(octaves))
+
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, chunk_count)
+    if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+        # spawn 방식은 워커마다 main.py(및 pygame 창)를 다시 불러오므로 fork일 때만 병렬 처리
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork")) as pool:
+            chunks = pool.map(generate_chunk, chunk_xs, *args, chunksize=max(1, chunk_count // (workers * 4)))
+            for chunk_x, tiles in zip(chunk_xs, chunks):
+                map_data[:, chunk_x * CHUNK_SIZE:(chunk_x + 1) * CHUNK_SIZE] = tiles
+    else:
+        for chunk_x, tiles in zip(chunk_xs, map(generate_chunk, chunk_xs, *args)):
+            map_data[:, chunk_x * CHUNK_SIZE:(chunk_x + 1) * CHUNK_SIZE] = tiles
+
+    return map_data[:, :width]
+
+class Chunk:
+    """
+    청크 하나의 타일 저장소. 타일 타입을 (height, CHUNK_SIZE) 크기의 연속된 배열로 가집니다.
+    - types: 타일 타입 (0 = 빈 칸)
+    """
+    def __init__(self, chunk_x, types):
+        self.chunk_x = chunk_x
+        self.types = types
+
+class World:
+    """
+    시드로부터 필요한 청크만 그때그때 생성하는 가로 방향 무한 월드.
+    청크 로더가 load_chunk를 호출해야 해당 청크의 지형이 만들어집니다.
+    """
+    def __init__(self, seed, height=WORLD_HEIGHT, frequency=0.05, octaves=4, saved_chunks=None, region_file=None):
+        self.seed = normalize_seed(seed) # None이면 저장된 청크 밖은 빈 공간 (시드 없는 옛 저장 파일)
+        self.height = height
+        self.frequency, self.octaves = frequency, octaves
+        self.saved_chunks = saved_chunks or {} # 옛 JSON 저장 파일에서 읽은 청크 {chunk_x: 타일 타입 배열}
+        self.region_file = region_file # 바이너리 저장 파일 (청크를 필요할 때 하나씩 읽음)
+        self.chunks = {} # 현재 로드된 청크 {chunk_x: Chunk}
+        self.dirty = set() # 로드된 뒤 타일이 바뀐 청크
+        self.solid_version = 0 # 칸이 막힘↔빈칸으로 바뀌거나 청크가 로드/언로드될 때마다 증가 (시야, 길찾기 캐시 무효화용)
+        self.tile_listeners = [] # 타일이 바뀔 때마다 (x, y)로 호출되는 함수들
+        self.written_back = {} # 바뀐 채로 언로드되어 아직 저장되지 않은 청크 {chunk_x: 압축된 블록}
+        # 청크 로더 스레드가 저장 상태(written_back, saved_chunks, region_file)를 읽는 동안 메인 스레드의 저장이 끼어들지 않도록 잠금
+        self.storage_lock = threading.RLock()
+
+    @classmethod
+    def from_save_data(cls, data):
+        if "region" in data: # 바이너리 리전 파일
+            region = data["region"]
+            return cls(region.seed, height=region.height, region_file=region)
+
+        if "map_data" in data: # 시드 없이 맵 전체를 저장하던 옛 형식
+            map_data = np.array(data["map_data"], dtype=np.uint8)
+            height, width = map_data.shape
+            chunk_count = -(-width // CHUNK_SIZE)
+            padded = np.zeros((height, chunk_count * CHUNK_SIZE), dtype=np.uint8)
+            padded[:, :width] = map_data
+            saved_chunks = {chunk_x: padded[:, chunk_x * CHUNK_SIZE:(chunk_x + 1) * CHUNK_SIZE].copy() for chunk_x in range(chunk_count)}
+            return cls(None, height=height, saved_chunks=saved_chunks)
+
+        return cls(data.get("seed")) # 새로 만든 월드 ({"seed": ...})
+
+    def chunk_data(self, chunk_x):
+        """청크의 타일 타입 배열 (height x CHUNK_SIZE). 저장된 청크가 없으면 시드로 생성합니다."""
+        with self.storage_lock: # 압축된 블록만 잠근 채로 가져오고 압축 해제는 잠금 밖에서
+            if chunk_x in self.saved_chunks:
+                return self.saved_chunks[chunk_x].copy()
+            block = self.written_back.get(chunk_x)
+            if block is None and self.region_file is not None and chunk_x in self.region_file:
+                block = self.region_file.read_raw(chunk_x)
+        if block is not None:
+            return decompress_chunk(block, self.height, CHUNK_SIZE)
+        if self.seed is None:
+            return np.zeros((self.height, CHUNK_SIZE), dtype=np.uint8)
+        return generate_chunk(chunk_x, CHUNK_SIZE, self.height, self.seed, self.frequency, self.octaves)
+
+    def prepare_chunk(self, chunk_x):
+        """
+        청크를 읽거나 생성해서 바로 넣을 수 있는 Chunk로 만듭니다 (월드에는 아직 넣지 않음).
+        월드 상태를 바꾸지 않으므로 백그라운드 스레드에서 호출해도 됩니다.
+        """
+        types = self.chunk_data(chunk_x)
+        # 위가 비어 있는 흙은 잔디로 표시
+        exposed = np.ones(types.shape, dtype=bool)
+        exposed[1:] = types[:-1] == 0
+        types[exposed & (types == 1)] = 2
+        return Chunk(chunk_x, types)
+
+    def add_chunk(self, chunk):
+        self.chunks[chunk.chunk_x] = chunk
+        self.solid_version += 1
+
+    def load_chunk(self, chunk_x):
+        self.add_chunk(self.prepare_chunk(chunk_x))
+
+    def add_tile_listener(self, listener):
+        self.tile_listeners.append(listener)
+
+    def remove_tile_listener(self, listener):
+        if listener in self.tile_listeners:
+            self.tile_listeners.remove(listener)
+
+    def _notify(self, x, y):
+        for listener in self.tile_listeners:
+            listener(x, y)
+
+    def unload_chunk(self, chunk_x):
+        chunk = self.chunks.pop(chunk_x, None)
+        self.solid_version += 1
+        # 바뀐 청크는 버리지 않고 압축해서 보관 (다시 로드하거나 저장할 때 사용)
+        if chunk is not None and chunk_x in self.dirty:
+            block = compress_chunk(chunk.types)
+            with self.storage_lock:
+                self.written_back[chunk_x] = block
+            self.dirty.discard(chunk_x)
+
+    def _locate(self, x, y):
+        """(x, y)가 속한 로드된 청크와 청크 안의 열 번호. 없으면 (None, 0)."""
+        if not 0 <= y < self.height:
+            return None, 0
+        return self.chunks.get(x // CHUNK_SIZE), x % CHUNK_SIZE
+
+    def get(self, x, y):
+        """(x, y)의 타일 타입. 빈 칸, 맵 위아래 바깥, 로드되지 않은 청크는 0."""
+        chunk, local_x = self._locate(x, y)
+        return int(chunk.types[y, local_x]) if chunk else 0
+
+    def is_solid(self, x, y):
+        return self.get(x, y) != 0
+
+    def is_empty(self, x, y):
+        """맵 안이고 블록이 없는 칸인지 (블록을 놓을 수 있는 자리인지)."""
+        return 0 <= y < self.height and not self.is_solid(x, y)
+
+    def has_support(self, x, y):
+        """빈 칸 (x, y)의 아래, 위, 옆 중 하나에 붙어서 설치할 블록이 있는지."""
+        return self.is_empty(x, y) and any(self.is_solid(x + dx, y + dy) for dx, dy in SUPPORT_OFFSETS)
+
+    def set(self, x, y, tile_type):
+        """(x, y)에 타일을 놓습니다 (0이면 제거)."""
+        chunk, local_x = self._locate(x, y)
+        if chunk:
+            if (chunk.types[y, local_x] != 0) != (tile_type != 0): # 잔디↔흙처럼 모양만 바뀌면 캐시는 그대로 둠
+                self.solid_version += 1
+            chunk.types[y, local_x] = tile_type
+            self.dirty.add(chunk.chunk_x)
+            self._notify(x, y)
+
+    def any_solid(self, x0, y0, x1, y1):
+        """[x0, x1) x [y0, y1) 범위에 블록이 하나라도 있는지 확인합니다. 로드되지 않은 칸은 빈 칸으로 봅니다."""
+        y0, y1 = max(0, y0), min(self.height, y1)
+        if y0 >= y1 or x0 >= x1:
+            return False
+        for chunk_x in range(x0 // CHUNK_SIZE, (x1 - 1) // CHUNK_SIZE + 1):
+            chunk = self.chunks.get(chunk_x)
+            if chunk is None:
+                continue
+            chunk_start = chunk_x * CHUNK_SIZE
+            if chunk.types[y0:y1, max(x0, chunk_start) - chunk_start:min(x1, chunk_start + CHUNK_SIZE) - chunk_start].any():
+                return True
+        return False
+
+    def collides_rect(self, rect):
+        """픽셀 좌표 Rect가 블록과 겹치는지 확인합니다."""
+        return self.any_solid(rect.left // TILE_SIZE, rect.top // TILE_SIZE, (rect.right - 1) // TILE_SIZE + 1, (rect.bottom - 1) // TILE_SIZE + 1)
+
+    def region(self, x0, y0, x1, y1):
+        """[x0, x1) x [y0, y1) 범위의 타일 타입을 (y1-y0, x1-x0) 배열로 복사해 반환합니다. 로드되지 않은 칸은 0."""
+        out = np.zeros((max(0, y1 - y0), max(0, x1 - x0)), dtype=np.uint8)
+        row_start, row_end = max(0, y0), min(self.height, y1)
+        if row_start >= row_end or x0 >= x1:
+            return out
+        for chunk_x in range(x0 // CHUNK_SIZE, (x1 - 1) // CHUNK_SIZE + 1):
+            chunk = self.chunks.get(chunk_x)
+            if chunk is None:
+                continue
+            chunk_start = chunk_x * CHUNK_SIZE
+            col_start, col_end = max(x0, chunk_start), min(x1, chunk_start + CHUNK_SIZE)
+            out[row_start - y0:row_end - y0, col_start - x0:col_end - x0] = chunk.types[row_start:row_end, col_start - chunk_start:col_end - chunk_start]
+        return out
+
+    def surface_y(self, x):
+        """x열에서 가장 위에 있는 블록의 y를 반환합니다 (청크를 로드하지 않고 지형 데이터로 계산)."""
+        column = self.chunk_data(x // CHUNK_SIZE)[:, x % CHUNK_SIZE]
+        solid = np.flatnonzero(column)
+        return int(solid[0]) if len(solid) else self.height
+
+    def dirty_blocks(self):
+        """저장되지 않은 변경이 있는 청크만 {chunk_x: 압축된 블록}으로 모읍니다."""
+        blocks = dict(self.written_back)
+        for chunk_x in self.dirty:
+            blocks[chunk_x] = compress_chunk(self.chunks[chunk_x].types)
+        return blocks
+
+    def mark_saved(self, region_file):
+        """저장이 끝난 뒤 호출. 이제부터 저장된 청크는 region_file에서 읽습니다."""
+        with self.storage_lock:
+            self.region_file = region_file
+            self.saved_chunks = {}
+            self.written_back = {}
+        self.dirty = set()
+
+def save_map(world, world_name, player_rect, folder=SAVE_FOLDER):
+    filename = os.path.join(folder, f"{world_name}{SAVE_EXTENSION}")
+    player_pos = (player_rect.x, player_rect.y)
+    with world.storage_lock: # 파일을 고쳐 쓰는 동안 청크 로더 스레드가 예전 오프셋으로 읽지 않도록 저장이 끝날 때까지 잠금
+        _write_world(world, filename, player_pos)
+
+    # 옛 JSON 저장 파일은 바이너리로 옮겨졌으므로 삭제
+    legacy_filename = os.path.join(folder, f"{world_name}.json")
+    if os.path.exists(legacy_filename): os.remove(legacy_filename)
+
+def _write_world(world, filename, player_pos):
+    blocks = world.dirty_blocks()
+
+    if world.region_file is not None and os.path.abspath(world.region_file.path) == os.path.abspath(filename):
+        # 바뀐 청크만 덧붙여 저장 (저장 시간은 월드 크기가 아니라 수정량에 비례)
+        world.region_file.append_chunks(blocks, player_pos)
+        world.mark_saved(world.region_file)
+    else:
+        # 처음 저장하는 월드: 기존 저장 파일의 청크와 바뀐 청크를 새 파일로 씀
+        all_blocks = {}
+        if world.region_file is not None:
+            all_blocks.update({chunk_x: world.region_file.read_raw(chunk_x) for chunk_x in world.region_file.chunk_xs()})
+        all_blocks.update({chunk_x: compress_chunk(types) for chunk_x, types in world.saved_chunks.items()})
+        all_blocks.update(blocks)
+        write_region(filename, all_blocks, world.height, CHUNK_SIZE, world.seed, player_pos)
+        world.mark_saved(RegionFile(filename))
 
 def load_map(filename):
-    try:
-        with open(filename, 'r') as f: return json.load(f)
+    if filename.endswith(".json"): # 옛 JSON 저장 파일
+        try:
+            with open(filename, 'r') as f: return json.load(f)
 
-    except (FileNotFoundError, json.JSONDecodeError):
-        return None
\ No newline at end of file
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    try:
+        region = RegionFile(filename)
+    except (OSError, ValueError, struct.error):
+        return None
+    if region.chunk_size != CHUNK_SIZE:
+        return None
+    return {"region": region, "player_pos": region.player_pos}
\ No newline at end of file